@@ -0,0 +1,148 @@
+"""
+Asyncio Crawl Engine
+
+Walks several Special:AllPages ranges concurrently with aiohttp while drawing
+from the scraper's shared rate limiter, reusing its parse and save logic.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+from retry import parse_retry_after, retry_reason
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCrawlEngine:
+    """Concurrent crawler driving a WikipediaScraper's parse and save steps"""
+
+    def __init__(self, scraper, concurrency: int = 8):
+        """
+        Initialize the engine
+
+        Args:
+            scraper: WikipediaScraper providing configuration, parsing and storage
+            concurrency: Maximum number of requests in flight at once
+        """
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.pages_scraped = 0
+        self._db_lock = None
+        self._semaphore = None
+
+    async def _fetch(self, http: aiohttp.ClientSession, url: str) -> Optional[bytes]:
+        """
+        Fetch a page body, retrying transient failures like WikipediaScraper._get_page
+
+        Args:
+            http: Shared aiohttp session
+            url: URL to fetch
+
+        Returns:
+            Response body or None if all attempts failed
+        """
+        cache = self.scraper.cache
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, url)
+            if cached is not None:
+                logger.info(f"Cache hit: {url}")
+                return cached
+
+        policy = self.scraper.retry_policy
+        limiter = self.scraper.rate_limiter
+        for attempt in range(policy.max_attempts):
+            retry_after = None
+            async with self._semaphore:
+                await limiter.acquire_async()
+                try:
+                    logger.info(f"Fetching: {url}")
+                    async with http.get(url) as response:
+                        limiter.on_response(response.status)
+                        reason = retry_reason(response.status, response.headers)
+                        if reason is None:
+                            response.raise_for_status()
+                            content = await response.read()
+                            if cache is not None:
+                                await asyncio.to_thread(cache.put, url, content)
+                            return content
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                except aiohttp.ClientResponseError as e:
+                    logger.error(f"Failed to fetch {url}: {e}")
+                    self.scraper._unretryable.add(url)
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    reason = str(e) or type(e).__name__
+
+            # Back off outside the semaphore so other ranges keep their slots
+            if attempt + 1 < policy.max_attempts:
+                wait = policy.backoff(attempt, retry_after)
+                logger.warning(f"Fetching {url} failed ({reason}), retry {attempt + 1} in {wait:.1f}s")
+                await asyncio.sleep(wait)
+            else:
+                logger.error(f"Failed to fetch {url} after {policy.max_attempts} attempts: {reason}")
+
+        return None
+
+    async def _crawl_range(self, http: aiohttp.ClientSession, range_id: Optional[int], start_url: str):
+        """
+        Walk one key range page by page until it has no next link
+
+        Args:
+            http: Shared aiohttp session
+            range_id: Persisted range to checkpoint (None for an ad-hoc crawl)
+            start_url: First page of the range
+        """
+        current_url = start_url
+        while current_url:
+            if not self.scraper._claim_page():
+                logger.info("Reached maximum page limit")
+                break
+
+            content = await self._fetch(http, current_url)
+            if content is None:
+                await asyncio.to_thread(self.scraper._record_failed_page, current_url, range_id)
+                break
+
+            articles, next_url = await asyncio.to_thread(self.scraper._parse_page, content, current_url)
+            if not articles:
+                logger.warning("No articles found on this page, stopping range")
+                break
+
+            async with self._db_lock:
+                await asyncio.to_thread(self.scraper._save_articles_to_db, articles)
+                self.pages_scraped += 1
+                await asyncio.to_thread(self.scraper._update_range_cursor, range_id, next_url)
+                db_count = await asyncio.to_thread(self.scraper.get_total_articles_count)
+            logger.info(f"Page {self.pages_scraped} completed. Total articles in DB: {db_count}")
+
+            current_url = next_url
+
+    async def _run(self, ranges: List[Tuple[Optional[int], str]]):
+        self._db_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        headers = dict(self.scraper.session.headers)
+        timeout = aiohttp.ClientTimeout(total=30)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as http:
+            await asyncio.gather(*(self._crawl_range(http, range_id, url) for range_id, url in ranges))
+
+    def run(self, ranges: List[Tuple[Optional[int], str]]) -> int:
+        """
+        Crawl all ranges concurrently
+
+        The scraper's max_pages budget is shared with its other workers.
+
+        Args:
+            ranges: (range_id, first page URL) of each independent key range
+
+        Returns:
+            Number of pages scraped
+        """
+        logger.info(f"Starting async crawl of {len(ranges)} range(s) with concurrency {self.concurrency}")
+        asyncio.run(self._run(ranges))
+        return self.pages_scraped
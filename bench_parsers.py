@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark
+
+Measures pages/sec of every installed HTML parser backend on a fixture corpus
+and checks that each one returns exactly what the html.parser reference does.
+Peak memory is the tracemalloc high-water mark while parsing the largest page
+(Python allocations only, so the C-level trees of lxml and selectolax are not
+counted).
+The corpus is either cached real responses (--cache-dir) or synthetic
+Special:AllPages pages. With --workers the corpus is also parsed through a
+process pool, as WikipediaScraper does with parse_workers.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Tuple
+
+from mock_wiki import generate_titles, render_allpages_html
+from parsers import available_parsers, get_parser, parse_page
+from response_cache import ResponseCache
+from sources import HtmlAllPagesSource, source_name_for_url
+
+
+BASE_URL = "https://en.wikipedia.org"
+
+
+def synthetic_corpus(pages: int, page_size: int = 345) -> List[Tuple[str, bytes]]:
+    """Render `pages` consecutive AllPages pages from synthetic titles"""
+    titles = generate_titles(pages * page_size + 1)
+    corpus = []
+    for i in range(pages):
+        chunk = titles[i * page_size:(i + 1) * page_size]
+        next_title = titles[(i + 1) * page_size]
+        corpus.append((f"page-{i}", render_allpages_html(chunk, next_title).encode('utf-8')))
+    return corpus
+
+
+def cached_corpus(cache_dir: str) -> List[Tuple[str, bytes]]:
+    """All cached Special:AllPages HTML responses"""
+    return [(url, content) for url, content in ResponseCache(cache_dir)
+            if source_name_for_url(url) == HtmlAllPagesSource.name]
+
+
+def peak_memory(parse, content: bytes) -> int:
+    """Peak bytes allocated by Python while parsing one page"""
+    tracemalloc.start()
+    parse(content, BASE_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic pages to generate')
+    parser.add_argument('--cache-dir', type=str, help='Use cached responses as the corpus instead')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed passes per parser (best is reported)')
+    parser.add_argument('--workers', type=int, default=0, help='Also measure parsing in a pool of N processes')
+    args = parser.parse_args()
+
+    corpus = cached_corpus(args.cache_dir) if args.cache_dir else synthetic_corpus(args.pages)
+    if not corpus:
+        print("Corpus is empty")
+        sys.exit(1)
+    total_bytes = sum(len(content) for _, content in corpus)
+    print(f"Corpus: {len(corpus)} pages, {total_bytes / 1024 ** 2:.1f} MiB")
+
+    reference = [get_parser('html.parser')(content, BASE_URL) for _, content in corpus]
+    largest = max((content for _, content in corpus), key=len)
+    baseline = None
+    in_process = {}
+
+    print(f"{'parser':<14}{'pages/sec':>12}{'MiB/sec':>10}{'speedup':>10}{'peak KiB':>10}  identical")
+    for name in available_parsers():
+        parse = get_parser(name)
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = [parse(content, BASE_URL) for _, content in corpus]
+            best = min(best, time.perf_counter() - started)
+
+        identical = results == reference
+        pages_per_sec = len(corpus) / best
+        in_process[name] = pages_per_sec
+        baseline = baseline or pages_per_sec
+        print(f"{name:<14}{pages_per_sec:>12.1f}{total_bytes / best / 1024 ** 2:>10.1f}"
+              f"{pages_per_sec / baseline:>9.1f}x{peak_memory(parse, largest) / 1024:>10.0f}"
+              f"  {'yes' if identical else 'NO'}")
+
+    if args.workers:
+        contents = [content for _, content in corpus]
+        print(f"\nProcess pool with {args.workers} workers")
+        print(f"{'parser':<14}{'pages/sec':>12}{'vs 1 proc':>10}  identical")
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for name in available_parsers():
+                best = float('inf')
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    results = list(pool.map(parse_page, repeat(name), contents, repeat(BASE_URL), chunksize=4))
+                    best = min(best, time.perf_counter() - started)
+                pages_per_sec = len(corpus) / best
+                print(f"{name:<14}{pages_per_sec:>12.1f}{pages_per_sec / in_process[name]:>9.1f}x"
+                      f"  {'yes' if results == reference else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Title Search Benchmark
+
+Builds (or reuses) a synthetic multi-million-title database with the
+trigram search index and measures query latency of search_titles() and
+prefix() against a LIKE '%query%' scan of the articles table. Substrings of
+stored titles measure queries with hits; random strings measure misses,
+the worst case of a scan.
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import string
+import time
+from typing import Callable, List
+
+from get_article_names import WikipediaScraper
+from mock_wiki import generate_titles
+from title_search import TitleSearch
+
+
+def build_database(path: str, titles: int, batch_size: int = 100000):
+    """Create a database holding `titles` synthetic titles and a search index"""
+    scraper = WikipediaScraper(db_name=path, search_index=True, background_writer=False)
+    corpus = generate_titles(titles)
+    started = time.perf_counter()
+    for i in range(0, len(corpus), batch_size):
+        scraper.store.save_titles(corpus[i:i + batch_size])
+    scraper.store.flush()
+    print(f"Loaded {len(corpus)} titles with the search index in {time.perf_counter() - started:.1f}s")
+    scraper.close()
+
+
+def measure(name: str, run: Callable[[str], List[str]], queries: List[str]):
+    """Print latency percentiles of run over queries"""
+    timings = []
+    hits = 0
+    for query in queries:
+        started = time.perf_counter()
+        hits += len(run(query))
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+    print(f"{name:<28}{statistics.median(timings):>10.2f}{p95:>10.2f}{timings[-1]:>10.2f}"
+          f"{hits / len(queries):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark title search queries')
+    parser.add_argument('--db', type=str, default='bench_search.db', help='Database to build or reuse')
+    parser.add_argument('--titles', type=int, default=2000000, help='Synthetic titles when building')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per measurement')
+    parser.add_argument('--limit', type=int, default=20, help='Results per query')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if not os.path.exists(args.db):
+        build_database(args.db, args.titles)
+
+    rng = random.Random(1)
+    with TitleSearch(args.db) as search:
+        count = search.conn.execute("SELECT value FROM article_stats WHERE name = 'articles'").fetchone()[0]
+        sample = [search.conn.execute("SELECT title FROM articles LIMIT 1 OFFSET ?",
+                                      (rng.randrange(count),)).fetchone()[0] for _ in range(args.queries)]
+        substrings = []
+        for title in sample:
+            length = min(len(title), rng.randint(3, 8))
+            start = rng.randrange(len(title) - length + 1)
+            substrings.append(title[start:start + length])
+        prefixes = [title[:rng.randint(1, len(title))] for title in sample]
+        misses = [''.join(rng.choices(string.ascii_lowercase, k=5)) for _ in sample]
+        like_queries = max(1, args.queries // 10)
+
+        def like_scan(query: str) -> List[str]:
+            return [title for title, in search.conn.execute(
+                "SELECT title FROM articles WHERE title LIKE ? LIMIT ?", (f"%{query}%", args.limit))]
+
+        print(f"Database: {args.db}, {count} titles, {os.path.getsize(args.db) / 1024 ** 2:.0f} MiB")
+        print(f"{'query (ms)':<28}{'p50':>10}{'p95':>10}{'max':>10}{'hits':>10}")
+        measure('search_titles', lambda q: search.search_titles(q, args.limit), substrings)
+        measure('search_titles ranked', lambda q: search.search_titles(q, args.limit, ranked=True),
+                substrings[:like_queries])
+        measure('search_titles miss', lambda q: search.search_titles(q, args.limit), misses)
+        measure('prefix', lambda q: search.prefix(q, args.limit), prefixes)
+        measure('LIKE scan', like_scan, substrings[:like_queries])
+        measure('LIKE scan miss', like_scan, misses[:like_queries])
+
+
+if __name__ == "__main__":
+    main()
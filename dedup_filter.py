@@ -0,0 +1,104 @@
+"""
+Title Dedup Filter
+
+In-memory membership filter of stored titles, so a recrawl can skip titles
+it already has before they reach SQLite. Titles are kept as 64-bit hashes:
+a sorted array('q') of everything loaded or merged so far plus a small set
+of titles added since the last merge, which is folded into the array once it
+grows past an eighth of it (so merges stay amortized O(n log n)).
+
+A miss means the title is certainly new. A hit is almost certainly a stored
+title, but two titles can share a hash, so callers confirm hits against the
+database before dropping them. The filter holds at most ``max_bytes`` worth
+of hashes; once full it stops growing and unseen titles simply go through
+SQLite's own duplicate check.
+"""
+
+import heapq
+import logging
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable
+
+
+logger = logging.getLogger(__name__)
+
+# Approximate memory per title: 8 bytes in the sorted array plus the share of the pending set
+BYTES_PER_TITLE = 16
+_LOAD_CHUNK = 1 << 20
+_MIN_MERGE = 1 << 16
+
+
+class TitleFilter:
+    """Sorted 64-bit hash array plus a set of recent additions"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 ** 2):
+        """
+        Args:
+            max_bytes: Memory budget; titles beyond max_bytes // BYTES_PER_TITLE are not tracked
+        """
+        self.max_titles = max_bytes // BYTES_PER_TITLE
+        self.full = False
+        self._sorted = array('q')
+        self._recent = set()
+
+    def load(self, titles: Iterable[str]):
+        """
+        Add many titles at once (e.g. every stored title at startup)
+
+        Hashes are sorted in chunks and merged, so the peak is about twice
+        the final array instead of a list of Python ints for every title.
+        """
+        titles = iter(titles)
+        runs = [self._sorted]
+        loaded = len(self)
+        while loaded < self.max_titles:
+            chunk = sorted(map(hash, islice(titles, min(_LOAD_CHUNK, self.max_titles - loaded))))
+            if not chunk:
+                break
+            runs.append(array('q', chunk))
+            loaded += len(chunk)
+        if next(titles, None) is not None:
+            self._set_full()
+        self._sorted = self._merge_runs(runs)
+
+    @staticmethod
+    def _merge_runs(runs) -> array:
+        if len(runs) == 1:
+            return runs[0]
+        merged = array('q')
+        merged.extend(heapq.merge(*runs))
+        return merged
+
+    def _set_full(self):
+        if not self.full:
+            self.full = True
+            logger.warning(f"Dedup filter is full at {self.max_titles} titles; "
+                           f"further titles are checked by SQLite only")
+
+    def add(self, title: str):
+        """Record a stored title"""
+        if len(self) >= self.max_titles:
+            self._set_full()
+            return
+        self._recent.add(hash(title))
+        if len(self._recent) >= max(_MIN_MERGE, len(self._sorted) // 8):
+            self._sorted = self._merge_runs([self._sorted, array('q', sorted(self._recent))])
+            self._recent.clear()
+
+    def __contains__(self, title: str) -> bool:
+        key = hash(title)
+        if key in self._recent:
+            return True
+        i = bisect_left(self._sorted, key)
+        return i < len(self._sorted) and self._sorted[i] == key
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory held by the filter"""
+        # A set entry costs about 64 bytes (slot plus int object)
+        return self._sorted.itemsize * len(self._sorted) + 64 * len(self._recent)
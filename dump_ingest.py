@@ -0,0 +1,104 @@
+"""
+Title Dump Ingest
+
+Loads a Wikimedia title dump (e.g. enwiki-latest-all-titles-in-ns0.gz) into
+the articles table without any network access. The dump is streamed line by
+line and inserted in large batches, so memory use stays flat.
+"""
+
+import bz2
+import gzip
+import logging
+import time
+from itertools import islice
+from typing import IO, Iterator
+
+
+logger = logging.getLogger(__name__)
+
+# Invalid lines logged individually before only the total is reported
+_MAX_DECODE_WARNINGS = 10
+
+
+def open_dump(path: str) -> IO[bytes]:
+    """
+    Open a title dump for binary reading, decompressing by file extension
+
+    Args:
+        path: Path to a .gz, .bz2 or plain text dump
+
+    Returns:
+        Byte stream over the dump
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_dump_titles(path: str) -> Iterator[str]:
+    """
+    Stream article titles from a title dump
+
+    Dumps store titles as database keys with underscores and start with a
+    ``page_title`` header line; titles are yielded as displayed on AllPages.
+    Lines that are not valid UTF-8 are skipped with a warning rather than
+    stored with replacement characters.
+
+    Args:
+        path: Path to the dump
+
+    Yields:
+        One title per dump line
+    """
+    skipped = 0
+    with open_dump(path) as dump:
+        for number, line in enumerate(dump, 1):
+            try:
+                title = line.decode('utf-8').rstrip('\r\n')
+            except UnicodeDecodeError as e:
+                skipped += 1
+                if skipped <= _MAX_DECODE_WARNINGS:
+                    logger.warning(f"Skipping line {number} of {path}: invalid UTF-8 ({e.reason})")
+                continue
+            if not title or title == 'page_title':
+                continue
+            yield title.replace('_', ' ')
+    if skipped:
+        logger.warning(f"Skipped {skipped} dump lines that are not valid UTF-8")
+
+
+def ingest_title_dump(store, path: str, batch_size: int = 100000) -> int:
+    """
+    Bulk insert every title of a dump into the articles table
+
+    Args:
+        store: ArticleStore of the target database
+        path: Path to the dump
+        batch_size: Titles per INSERT batch and transaction
+
+    Returns:
+        Number of new articles inserted
+    """
+    titles = iter_dump_titles(path)
+    inserted = 0
+    seen = 0
+    start = time.monotonic()
+
+    while True:
+        batch = list(islice(titles, batch_size))
+        if not batch:
+            break
+
+        inserted += store.save_titles(batch)
+        seen += len(batch)
+
+        elapsed = time.monotonic() - start
+        state = 'staged' if store.bulk_path else 'new'
+        logger.info(f"Ingested {seen} titles ({inserted} {state}, {seen / elapsed:,.0f} rows/s)")
+
+    elapsed = time.monotonic() - start
+    state = 'staged' if store.bulk_path else 'new'
+    logger.info(f"Dump ingest completed: {inserted} {state} articles from {seen} titles in {elapsed:.1f}s")
+    return inserted
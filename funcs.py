@@ -1,16 +1,140 @@
 import sqlite3
 import os
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
+
+
+# Only take effect before the first table is created (or on VACUUM), so they are applied first
+_CREATION_PRAGMAS = ('page_size', 'auto_vacuum')
+_AUTO_VACUUM_MODES = {'NONE': 0, 'FULL': 1, 'INCREMENTAL': 2}
+
+
+def _table_definition(table_def: Dict) -> Tuple[Dict, Dict]:
+    """
+    Split a table definition into its columns and table-level options.
+    
+    A definition is either a plain column dict or a dict with a 'columns'
+    key plus table-level options.
+    """
+    columns = table_def.get('columns')
+    if isinstance(columns, dict) and 'type' not in columns:
+        return columns, table_def
+    return table_def, {}
+
+
+def _column_sql(col_name: str, col_props: Dict) -> str:
+    """Column definition of a CREATE TABLE statement"""
+    col_def = f"{col_name} {col_props['type']}"
+    
+    # Add constraints
+    if col_props.get('primary_key', False):
+        col_def += " PRIMARY KEY"
+    
+    if col_props.get('not_null', False):
+        col_def += " NOT NULL"
+    
+    if col_props.get('unique', False):
+        col_def += " UNIQUE"
+    
+    if 'default' in col_props:
+        default_val = col_props['default']
+        if isinstance(default_val, str) and default_val != 'CURRENT_TIMESTAMP':
+            col_def += f" DEFAULT '{default_val}'"
+        else:
+            col_def += f" DEFAULT {default_val}"
+    
+    return col_def
+
+
+def create_table_sql(table_name: str, table_def: Dict) -> str:
+    """
+    Build the CREATE TABLE statement of a table definition.
+    
+    Parameters:
+    -----------
+    table_name : str
+        Name of the table
+    table_def : Dict
+        Column dict or table definition, as accepted by create_sqlite_db()
+    
+    Returns:
+    --------
+    str
+        CREATE TABLE statement
+    """
+    columns, options = _table_definition(table_def)
+    
+    column_definitions = [_column_sql(col_name, col_props) for col_name, col_props in columns.items()]
+    constraints = []
+    if options.get('primary_key'):
+        constraints.append(f"PRIMARY KEY ({', '.join(options['primary_key'])})")
+    
+    # Handle foreign keys
+    for col_name, col_props in columns.items():
+        if 'foreign_key' in col_props:
+            constraints.append(f"FOREIGN KEY ({col_name}) REFERENCES {col_props['foreign_key']}")
+    
+    table_options = []
+    if options.get('without_rowid', False):
+        table_options.append("WITHOUT ROWID")
+    if options.get('strict', False):
+        table_options.append("STRICT")
+    
+    sql = f"CREATE TABLE {table_name} ({', '.join(column_definitions + constraints)})"
+    if table_options:
+        sql += " " + ", ".join(table_options)
+    return sql
+
+
+def create_index_sql(table_name: str, index_name: str, index_def: Dict) -> str:
+    """
+    Build the CREATE INDEX statement of an index definition.
+    
+    Parameters:
+    -----------
+    table_name : str
+        Name of the indexed table
+    index_name : str
+        Name of the index
+    index_def : Dict
+        {'columns': list of column names (or expressions such as 'title DESC'),
+         'unique': bool (optional), 'where': str (optional, partial index condition)}
+    
+    Returns:
+    --------
+    str
+        CREATE INDEX statement (IF NOT EXISTS)
+    """
+    unique = "UNIQUE " if index_def.get('unique', False) else ""
+    sql = f"CREATE {unique}INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(index_def['columns'])})"
+    if index_def.get('where'):
+        sql += f" WHERE {index_def['where']}"
+    return sql
+
+
+def _apply_pragmas(cursor: sqlite3.Cursor, pragmas: Dict[str, Union[str, int]]):
+    """Set database pragmas, reporting those an existing database keeps"""
+    for pragma in sorted(pragmas, key=lambda name: name not in _CREATION_PRAGMAS):
+        value = pragmas[pragma]
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+        if pragma in _CREATION_PRAGMAS:
+            expected = _AUTO_VACUUM_MODES.get(str(value).upper(), value) if pragma == 'auto_vacuum' else value
+            actual = cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+            if str(actual) != str(expected):
+                print(f"PRAGMA {pragma} stays {actual} for the existing database (changing it requires VACUUM)")
 
 
 def create_sqlite_db(
     db_name: str,
     table_schema: Dict[str, Dict[str, Union[str, bool, int]]],
-    db_path: str = "."
+    db_path: str = ".",
+    pragmas: Optional[Dict[str, Union[str, int]]] = None
 ) -> bool:
     """
     Creates a SQLite database if it doesn't exist with specified tables and columns.
     
+    All missing tables and indexes are created in a single transaction, so a
+    failure leaves the database as it was.
+    
     Parameters:
     -----------
     db_name : str
@@ -26,8 +150,18 @@ def create_sqlite_db(
             'default': str/int/float (optional),
             'foreign_key': str (optional, format: 'table(column)')
           }
+        To declare table-level options, define the table as a dict with:
+        - 'columns': the column definitions above
+        - 'primary_key': list of str (optional, composite primary key)
+        - 'without_rowid': bool (optional, WITHOUT ROWID table)
+        - 'strict': bool (optional, STRICT table; needs SQLite 3.37+)
+        - 'indexes': {index_name: {'columns': list, 'unique': bool, 'where': str}}
+          (optional; also created on existing tables)
     db_path : str
         Path where the database file should be created (default: current directory)
+    pragmas : Dict[str, Union[str, int]], optional
+        Database pragmas applied before the tables are created (e.g. page_size,
+        auto_vacuum, journal_mode); page_size and auto_vacuum only affect a new database
     
     Returns:
     --------
@@ -45,14 +179,21 @@ def create_sqlite_db(
             'created_at': {'type': 'TIMESTAMP', 'default': 'CURRENT_TIMESTAMP'}
         },
         'posts': {
-            'id': {'type': 'INTEGER', 'primary_key': True, 'not_null': True},
-            'title': {'type': 'TEXT', 'not_null': True},
-            'content': {'type': 'TEXT'},
-            'user_id': {'type': 'INTEGER', 'foreign_key': 'users(id)'}
+            'columns': {
+                'user_id': {'type': 'INTEGER', 'not_null': True, 'foreign_key': 'users(id)'},
+                'slug': {'type': 'TEXT', 'not_null': True},
+                'title': {'type': 'TEXT', 'not_null': True},
+                'content': {'type': 'TEXT'}
+            },
+            'primary_key': ['user_id', 'slug'],
+            'without_rowid': True,
+            'indexes': {
+                'posts_by_title': {'columns': ['title', 'user_id']}
+            }
         }
     }
     
-    create_sqlite_db('my_app', table_schema)
+    create_sqlite_db('my_app', table_schema, pragmas={'page_size': 8192, 'journal_mode': 'WAL'})
     """
     
     try:
@@ -66,70 +207,41 @@ def create_sqlite_db(
         # Check if database already exists
         db_exists = os.path.exists(full_db_path)
         
-        # Connect to database (creates it if it doesn't exist)
-        conn = sqlite3.connect(full_db_path)
+        # Connect to database (creates it if it doesn't exist); transactions are explicit
+        conn = sqlite3.connect(full_db_path, isolation_level=None)
         cursor = conn.cursor()
         
         print(f"{'Connected to existing' if db_exists else 'Created new'} database: {full_db_path}")
         
-        # Create tables
-        for table_name in table_schema.keys():
-            # Check if table already exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name=?
-            """, (table_name,))
-            
-            if cursor.fetchone():
-                print(f"Table '{table_name}' already exists. Skipping creation.")
-                continue
-            
-            # Build CREATE TABLE statement
-            column_definitions = []
-            foreign_keys = []
-            
-            for col_name, col_props in table_schema[table_name].items():
-                col_def = f"{col_name} {col_props['type']}"
-                
-                # Add constraints
-                if col_props.get('primary_key', False):
-                    col_def += " PRIMARY KEY"
-                
-                if col_props.get('not_null', False):
-                    col_def += " NOT NULL"
-                
-                if col_props.get('unique', False):
-                    col_def += " UNIQUE"
+        # Pragmas such as journal_mode cannot change inside a transaction
+        _apply_pragmas(cursor, pragmas or {})
+        
+        cursor.execute("BEGIN")
+        try:
+            # Create tables
+            for table_name, table_def in table_schema.items():
+                columns, options = _table_definition(table_def)
                 
-                if 'default' in col_props:
-                    default_val = col_props['default']
-                    if isinstance(default_val, str) and default_val != 'CURRENT_TIMESTAMP':
-                        col_def += f" DEFAULT '{default_val}'"
-                    else:
-                        col_def += f" DEFAULT {default_val}"
+                # Check if table already exists
+                cursor.execute("""
+                    SELECT name FROM sqlite_master 
+                    WHERE type='table' AND name=?
+                """, (table_name,))
                 
-                column_definitions.append(col_def)
+                if cursor.fetchone():
+                    print(f"Table '{table_name}' already exists. Skipping creation.")
+                else:
+                    cursor.execute(create_table_sql(table_name, table_def))
+                    print(f"Created table '{table_name}' with {len(columns)} columns")
                 
-                # Handle foreign keys
-                if 'foreign_key' in col_props:
-                    fk_ref = col_props['foreign_key']
-                    foreign_keys.append(f"FOREIGN KEY ({col_name}) REFERENCES {fk_ref}")
-            
-            # Combine column definitions and foreign keys
-            all_definitions = column_definitions + foreign_keys
-            
-            # Create the table
-            create_table_sql = f"""
-            CREATE TABLE {table_name} (
-                {', '.join(all_definitions)}
-            )
-            """
+                for index_name, index_def in options.get('indexes', {}).items():
+                    cursor.execute(create_index_sql(table_name, index_name, index_def))
             
-            cursor.execute(create_table_sql)
-            print(f"Created table '{table_name}' with {len(table_schema[table_name])} columns")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
         
-        # Commit changes and close connection
-        conn.commit()
         conn.close()
         
         print(f"Database '{db_name}' setup completed successfully!")
@@ -7,14 +7,27 @@ and saves them to a SQLite database using BeautifulSoup.
 """
 
 import requests
-from bs4 import BeautifulSoup
 import sqlite3
 import time
 import logging
-from urllib.parse import urljoin, parse_qs, urlparse
+import signal
 import sys
-from typing import List, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
 from funcs import create_sqlite_db
+from keyspace import plan_ranges
+from parsers import PARSERS, StreamingAllPagesParser, iter_stream_titles
+from sources import SOURCES, create_source, source_name_for_url
+from storage import ARTICLE_LAYOUTS, STORAGE_PROFILES, ArticleStore, BackgroundWriter
+from dump_ingest import ingest_title_dump
+from ingest_log import IngestLog
+from sharding import SHARD_SCHEMES, ShardReader, ShardedArticleStore, ShardedWriter, open_shard_router, shard_paths
+from title_archive import export_archive, import_archive, write_archive
+from title_search import TitleSearch
+from rate_limit import TokenBucket, AdaptiveRateLimiter
+from retry import RetryPolicy, parse_retry_after, retry_reason
+from response_cache import ResponseCache
 
 
 # Configure logging
@@ -31,126 +44,333 @@ logger = logging.getLogger(__name__)
 class WikipediaScraper:
     """Scraper for Wikipedia article names from Special:AllPages"""
     
-    def __init__(self, db_name: str = "wikipedia_articles.db", delay: float = 1.0):
+    ENGINES = ('sync', 'async', 'pipeline')
+    
+    def __init__(self, db_name: str = "wikipedia_articles.db", delay: float = 1.0,
+                 base_url: str = "https://en.wikipedia.org", engine: str = "sync",
+                 concurrency: int = 8, backend: str = "html", queue_size: int = 8,
+                 rate: Optional[float] = None, burst: int = 1, adaptive: bool = False,
+                 max_attempts: int = 5, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 2 * 1024 ** 3, parser: str = "html.parser",
+                 parse_workers: int = 0, storage_profile: str = "fast-bulk", commit_rows: int = 10000,
+                 commit_interval: float = 2.0, background_writer: bool = True, writer_queue_size: int = 64,
+                 layout: Optional[str] = None, migrate_layout: bool = False, search_index: bool = False,
+                 dedup_filter_bytes: int = 0, shards: int = 0, shard_by: str = "first-char",
+                 ingest_log: Optional[str] = None):
         """
         Initialize the scraper
         
         Args:
             db_name: Name of the SQLite database file
             delay: Delay between requests in seconds (be respectful to Wikipedia)
+            base_url: Wiki to scrape (point at a local stand-in for testing)
+            engine: Crawl engine, 'sync' (one request at a time), 'async' (concurrent requests)
+                or 'pipeline' (fetch, parse and store overlapped on separate threads)
+            concurrency: Maximum in-flight requests for the async engine
+            backend: Title source, 'html' (Special:AllPages) or 'api' (api.php list=allpages)
+            queue_size: Depth of each bounded stage queue of the pipeline engine
+            rate: Requests per second shared by all workers (default: 1 / delay)
+            burst: Requests that may be sent back to back after an idle period
+            adaptive: Slow down on HTTP 429/503 and speed back up while responses are healthy
+            max_attempts: Attempts per page (with backoff) before it is parked in failed_pages
+            cache_dir: Directory of a persistent compressed response cache consulted before fetching
+            cache_max_bytes: Cache size above which least recently used responses are evicted
+            parser: HTML parser backend for the html source ('html.parser', 'strainer', 'lxml',
+                'selectolax', 'fast' or 'stream'); with 'stream' the sync engine parses
+                pages incrementally while they download
+            parse_workers: Worker processes for HTML parsing (0 parses in the calling thread)
+            storage_profile: SQLite tuning of the writer connection, 'durable' or 'fast-bulk'
+            commit_rows: New titles per group commit (1 commits after every page)
+            commit_interval: Maximum seconds a saved page waits for its group commit
+            background_writer: Apply title and checkpoint writes on a dedicated thread
+            writer_queue_size: Pages waiting for the background writer before crawl loops block
+            layout: Articles table layout, 'rowid' (id + UNIQUE title) or 'title' (WITHOUT ROWID,
+                keyed on the title); None keeps the existing layout ('rowid' for a new database)
+            migrate_layout: Rebuild an existing articles table whose layout differs from `layout`
+            search_index: Build a trigram full-text index over titles and keep it in sync
+                (an existing index is always kept in sync)
+            dedup_filter_bytes: Memory for an in-memory filter of stored titles that keeps
+                recrawled titles away from INSERT statements (0 disables it)
+            shards: Spread titles over this many database files, each with its own writer
+                (a new database only; 0 opens an existing database as it was created)
+            shard_by: Shard routing of a new sharded database, 'first-char' (title ranges) or 'hash'
+            ingest_log: Append parsed pages to this checksummed log and replay it into SQLite
+                in sorted batches on a compactor thread (replaces the background writer);
+                segments left by a crash are replayed on startup
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        
         self.db_name = db_name
         self.delay = delay
-        self.base_url = "https://en.wikipedia.org"
+        self.base_url = base_url.rstrip('/')
+        self.engine = engine
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.parser = parser
+        self.parse_workers = parse_workers
+        self.parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+        if rate is None:
+            rate = 1.0 / delay if delay > 0 else 0.0
+        limiter_class = AdaptiveRateLimiter if adaptive else TokenBucket
+        self.rate_limiter = limiter_class(rate, burst)
+        self.retry_policy = RetryPolicy(max_attempts=max_attempts)
+        self.cache = ResponseCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+        self.source = create_source(backend, self)
+        self._pages_lock = threading.Lock()
+        self._pages_remaining = None
+        # Set on Ctrl+C/SIGTERM so range worker threads stop after their current page
+        self._stop = threading.Event()
+        # Pages answered with a client error that no retry will fix (never parked in failed_pages)
+        self._unretryable = set()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Wikipedia Article Scraper (Educational Purpose)'
         })
         
         # Initialize database
-        self._setup_database()
+        self._setup_database(layout)
+        router = open_shard_router(self.db_name, shards, shard_by)
+        if router is not None:
+            for path in shard_paths(self.db_name, router.shards):
+                self._setup_database(layout, path, crawl_state=False)
+            self.store = ShardedArticleStore(self.db_name, router, profile=storage_profile,
+                                             commit_rows=commit_rows, commit_interval=commit_interval,
+                                             dedup_filter_bytes=dedup_filter_bytes)
+        else:
+            self.store = ArticleStore(self.db_name, profile=storage_profile, commit_rows=commit_rows,
+                                      commit_interval=commit_interval, dedup_filter_bytes=dedup_filter_bytes)
+        if layout is not None and self.store.layout != layout:
+            if not migrate_layout:
+                self.store.close()
+                raise ValueError(f"'{db_name}' uses the '{self.store.layout}' articles layout; "
+                                 f"enable migrate_layout to convert it to '{layout}'")
+            self.store.migrate_layout(layout)
+        if search_index:
+            self.store.enable_search()
+        self._search = None
+        self.writer = None
+        if ingest_log is not None:
+            self.writer = IngestLog(self.store, ingest_log, fsync=storage_profile == 'durable')
+        elif background_writer and router is not None:
+            self.writer = ShardedWriter(self.store, queue_size=writer_queue_size)
+        elif background_writer:
+            self.writer = BackgroundWriter(self.store, queue_size=writer_queue_size)
+        
+    def _setup_database(self, layout: Optional[str] = None, db_name: Optional[str] = None,
+                        crawl_state: bool = True):
+        """
+        Setup the SQLite database with required tables
+        
+        Args:
+            layout: Articles table layout of a new database
+            db_name: Database file (default: the scraper's database)
+            crawl_state: Also create the crawl checkpoint tables (not needed in shard files)
+        """
+        db_name = db_name or self.db_name
+        layout = layout or 'rowid'
+        if layout not in ARTICLE_LAYOUTS:
+            raise ValueError(f"Unknown articles layout '{layout}', expected one of {tuple(ARTICLE_LAYOUTS)}")
         
-    def _setup_database(self):
-        """Setup the SQLite database with required tables"""
         table_schema = {
-            'articles': {
+            'articles': ARTICLE_LAYOUTS[layout],
+            'article_stats': {
+                'name': {'type': 'TEXT', 'primary_key': True, 'not_null': True},
+                'value': {'type': 'INTEGER', 'not_null': True, 'default': 0}
+            },
+            'crawl_ranges': {
                 'id': {'type': 'INTEGER', 'primary_key': True, 'not_null': True},
-                'title': {'type': 'TEXT', 'not_null': True, 'unique': True}
+                'start_title': {'type': 'TEXT', 'not_null': True},
+                'end_title': {'type': 'TEXT'},
+                'next_url': {'type': 'TEXT'},
+                'done': {'type': 'INTEGER', 'not_null': True, 'default': 0}
+            },
+            'failed_pages': {
+                'url': {'type': 'TEXT', 'primary_key': True, 'not_null': True},
+                'range_id': {'type': 'INTEGER'},
+                'failures': {'type': 'INTEGER', 'not_null': True, 'default': 1},
+                'failed_at': {'type': 'TIMESTAMP', 'default': 'CURRENT_TIMESTAMP'}
             }
         }
+        if not crawl_state:
+            del table_schema['crawl_ranges'], table_schema['failed_pages']
         
-        success = create_sqlite_db(self.db_name, table_schema)
+        success = create_sqlite_db(db_name, table_schema)
         if not success:
             raise Exception("Failed to setup database")
         
-        logger.info(f"Database '{self.db_name}' setup completed")
+        logger.info(f"Database '{db_name}' setup completed")
     
-    def _get_page(self, url: str) -> Optional[BeautifulSoup]:
+    def _request(self, url: str, stream: bool = False,
+                 read: Optional[Callable[[requests.Response], Any]] = None) -> Any:
         """
-        Fetch a page and return BeautifulSoup object
+        Send a GET request, retrying transient failures
+        
+        Retries use exponential backoff with jitter and wait at least as long
+        as a Retry-After header or MediaWiki maxlag response asks for.
         
         Args:
             url: URL to fetch
+            stream: Return before the body is downloaded (read it with iter_content)
+            read: Consumes the body of a successful response; a download failing
+                inside it is retried like a failed request
             
         Returns:
-            BeautifulSoup object or None if failed
+            Successful response (or what read returned for it), or None if all attempts failed
         """
-        try:
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Add delay to be respectful
-            time.sleep(self.delay)
-            
-            return BeautifulSoup(response.content, 'html.parser')
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
+            retry_after = None
+            try:
+                # Wait for a slot of the shared request budget to be respectful
+                self.rate_limiter.acquire()
+                
+                logger.info(f"Fetching: {url}")
+                response = self.session.get(url, timeout=30, stream=stream)
+                self.rate_limiter.on_response(response.status_code)
+                
+                reason = retry_reason(response.status_code, response.headers)
+                if reason is None:
+                    response.raise_for_status()
+                    return response if read is None else read(response)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                response.close()
+                
+            except requests.HTTPError as e:
+                # Client errors other than 429 will not succeed on a retry
+                logger.error(f"Failed to fetch {url}: {e}")
+                self._unretryable.add(url)
+                return None
+            except requests.RequestException as e:
+                reason = str(e)
             
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch {url}: {e}")
-            return None
+            if attempt + 1 < policy.max_attempts:
+                wait = policy.backoff(attempt, retry_after)
+                logger.warning(f"Fetching {url} failed ({reason}), retry {attempt + 1} in {wait:.1f}s")
+                if self._stop.wait(wait):
+                    return None
+            else:
+                logger.error(f"Failed to fetch {url} after {policy.max_attempts} attempts: {reason}")
+        
+        return None
     
-    def _extract_articles_from_page(self, soup: BeautifulSoup) -> List[dict]:
+    def _get_page(self, url: str) -> Optional[bytes]:
         """
-        Extract article names and URLs from a Special:AllPages page
+        Fetch a page and return its raw body, from the response cache if possible
         
         Args:
-            soup: BeautifulSoup object of the page
+            url: URL to fetch
             
         Returns:
-            List of dictionaries with article info
+            Response body or None if all attempts failed
         """
-        articles = []
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                logger.info(f"Cache hit: {url}")
+                return cached
         
-        # Find the content div containing the article list
-        content_div = soup.find('div', {'class': 'mw-allpages-body'})
-        if not content_div:
-            logger.warning("Could not find article list container")
-            return articles
+        response = self._request(url)
+        if response is None:
+            return None
+        if self.cache is not None:
+            self.cache.put(url, response.content)
+        return response.content
+    
+    def _stream_page(self, url: str) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """
+        Fetch a Special:AllPages page and extract titles while it downloads
         
-        # Find all article links
-        article_links = content_div.find_all('a')
+        Chunks go straight into an event parser, so neither the whole raw body
+        (unless it is being cached) nor a DOM is ever held in memory.
         
-        for link in article_links:
-            title = link.get('title')
-            href = link.get('href')
+        Args:
+            url: URL to fetch
             
-            if title and href and href.startswith('/wiki/'):
-                articles.append({
-                    'title': title
-                })
+        Returns:
+            Tuple of (articles, URL of the next page or None), or None if the fetch failed
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None:
+            logger.info(f"Cache hit: {url}")
+            parsed = self._parse_stream([cached])
+        else:
+            parsed = self._request(url, stream=True, read=lambda response: self._read_stream(url, response))
+            if parsed is None:
+                return None
         
+        articles, next_url = parsed
         logger.info(f"Extracted {len(articles)} articles from page")
-        return articles
+        return articles, self.source.bound_next_url(url, next_url)
+    
+    def _read_stream(self, url: str, response: requests.Response) -> Tuple[List[dict], Optional[str]]:
+        """Parse a streamed response as it downloads, caching the raw body if a cache is configured"""
+        raw = [] if self.cache is not None else None
+        try:
+            parsed = self._parse_stream(self._tee(response.iter_content(chunk_size=16384), raw), time.monotonic())
+        finally:
+            response.close()
+        if raw is not None:
+            self.cache.put(url, b''.join(raw))
+        return parsed
+    
+    def _parse_stream(self, chunks, started: Optional[float] = None) -> Tuple[List[dict], Optional[str]]:
+        """Feed chunks to a fresh incremental parser; every download attempt starts over with its own"""
+        parser = StreamingAllPagesParser(self.base_url)
+        articles = []
+        for titles in iter_stream_titles(chunks, parser):
+            if not articles and started is not None:
+                logger.debug(f"First titles after {(time.monotonic() - started) * 1000:.0f} ms")
+            articles.extend({'title': title} for title in titles)
+        return articles, parser.next_url
+    
+    @staticmethod
+    def _tee(chunks, sink: Optional[list]):
+        """Pass chunks through, also appending them to sink when given"""
+        for chunk in chunks:
+            if sink is not None:
+                sink.append(chunk)
+            yield chunk
+    
+    def close(self):
+        """Release resources held for the lifetime of the scraper"""
+        if self.writer is not None:
+            self.writer.close()
+        if self._search is not None:
+            self._search.close()
+            self._search = None
+        self.store.close()
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+    
+    def _fetch_and_parse(self, url: str) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """
+        Fetch and parse one page, streaming when the 'stream' parser is selected
+        
+        Returns:
+            Tuple of (articles, URL of the next page or None), or None if the fetch failed
+        """
+        if self.parser == 'stream' and self.source.name == 'html':
+            return self._stream_page(url)
+        
+        content = self._get_page(url)
+        if content is None:
+            return None
+        return self._parse_page(content, url)
     
-    def _find_next_page_url(self, soup: BeautifulSoup) -> Optional[str]:
+    def _parse_page(self, content: bytes, url: str) -> Tuple[List[dict], Optional[str]]:
         """
-        Find the URL for the next page of results
+        Parse a raw response with the configured source backend
         
         Args:
-            soup: BeautifulSoup object of the current page
+            content: Response body
+            url: URL the body was fetched from
             
         Returns:
-            URL of next page or None if no next page
-        """
-        # Look for "Next page" link
-        next_links = soup.find_all('a', string=lambda text: text and 'next' in text.lower())
-        
-        for link in next_links:
-            href = link.get('href')
-            if href and 'Special:AllPages' in href:
-                return urljoin(self.base_url, href)
-        
-        # Alternative: look for navigation links
-        nav_div = soup.find('div', {'class': 'mw-allpages-nav'})
-        if nav_div:
-            links = nav_div.find_all('a')
-            for link in links:
-                if 'next' in link.get_text().lower():
-                    href = link.get('href')
-                    if href:
-                        return urljoin(self.base_url, href)
-        
-        return None
+            Tuple of (articles on the page, URL of the next page or None)
+        """
+        return self.source.parse(content, url)
     
     def _save_articles_to_db(self, articles: List[dict]):
         """
@@ -162,85 +382,316 @@ class WikipediaScraper:
         if not articles:
             return
         
+        if self.writer is not None:
+            self.writer.save_titles([article['title'] for article in articles])
+            return
+        
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            
             # Insert articles (ignore duplicates)
-            cursor.executemany(
-                "INSERT OR IGNORE INTO articles (title) VALUES (?)",
-                [(article['title'],) for article in articles]
-            )
-            
-            rows_affected = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Saved {rows_affected} new articles to database")
+            rows_affected = self.store.save_titles(article['title'] for article in articles)
+            if self.store.bulk_path:
+                logger.info(f"Staged {rows_affected} new articles to database")
+            else:
+                logger.info(f"Saved {rows_affected} new articles to database "
+                            f"({len(articles) - rows_affected} already stored)")
             
         except sqlite3.Error as e:
+            # The batch was rolled back; stop the range so its cursor never passes the page
             logger.error(f"Database error: {e}")
+            raise
+    
+    def flush_writes(self):
+        """Apply and commit every pending title and checkpoint write"""
+        if self.writer is not None:
+            self.writer.flush()
+        else:
+            self.store.flush()
+    
+    def rebuild_from_cache(self, bulk: bool = False) -> int:
+        """
+        Re-parse every cached response into the database, without network access
+        
+        Each entry is parsed by the source backend matching its URL, so caches
+        holding both HTML and API responses can be replayed.
+        
+        Args:
+            bulk: Stage titles unindexed and merge them in one sorted pass at the end
+            
+        Returns:
+            Number of cached pages processed
+        """
+        if self.cache is None:
+            raise ValueError("rebuild_from_cache requires a cache_dir")
+        
+        sources = {self.source.name: self.source}
+        pages = 0
+        logger.info(f"Rebuilding database from response cache: {self.cache.directory}")
+        if bulk:
+            self.flush_writes()
+            self.store.begin_bulk_load()
+        for url, content in self.cache:
+            name = source_name_for_url(url)
+            if name not in sources:
+                sources[name] = create_source(name, self)
+            articles, _ = sources[name].parse(content, url)
+            self._save_articles_to_db(articles)
+            pages += 1
+        
+        self.flush_writes()
+        if bulk:
+            self.store.finish_bulk_load()
+        logger.info(f"Rebuilt database from {pages} cached pages")
+        return pages
+    
+    def ingest_dump(self, path: str, bulk: bool = False) -> int:
+        """
+        Load all titles of a local Wikimedia title dump, without network access
+        
+        Args:
+            path: Path to all-titles-in-ns0 (.gz, .bz2 or plain text)
+            bulk: Stage titles unindexed and merge them in one sorted pass at the end
+            
+        Returns:
+            Number of new articles inserted
+        """
+        logger.info(f"Ingesting title dump: {path}")
+        self.flush_writes()
+        if not bulk:
+            return ingest_title_dump(self.store, path)
+        
+        self.store.begin_bulk_load()
+        ingest_title_dump(self.store, path)
+        return self.store.finish_bulk_load()
+    
+    def export_archive(self, path: str) -> int:
+        """
+        Write all titles to a front-coded, block-compressed archive (see title_archive.py)
+        
+        Args:
+            path: Output file
+            
+        Returns:
+            Number of titles exported
+        """
+        self.flush_writes()
+        if isinstance(self.store, ShardedArticleStore):
+            with ShardReader(self.db_name) as reader:
+                return write_archive(reader.titles(), path)
+        return export_archive(self.db_name, path)
+    
+    def import_archive(self, path: str) -> int:
+        """
+        Load all titles of an archive written by export_archive()
+        
+        Args:
+            path: Archive file
+            
+        Returns:
+            Number of new articles inserted
+        """
+        logger.info(f"Importing title archive: {path}")
+        self.flush_writes()
+        return import_archive(self.store, path)
+    
+    def _open_search(self):
+        """Read-only query connection, opened on first use (all shards attached when sharded)"""
+        if self._search is None:
+            if isinstance(self.store, ShardedArticleStore):
+                self._search = ShardReader(self.db_name)
+            else:
+                self._search = TitleSearch(self.db_name)
+        return self._search
+    
+    def search_titles(self, query: str, limit: int = 20, ranked: bool = False) -> List[str]:
+        """
+        Find committed titles containing query, ignoring case (requires search_index)
+        
+        Args:
+            query: Substring to look for
+            limit: Maximum number of titles
+            ranked: Order by relevance (slower for common substrings)
+            
+        Returns:
+            Matching titles
+        """
+        return self._open_search().search_titles(query, limit, ranked)
+    
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """
+        Find committed titles starting with prefix
+        
+        Args:
+            prefix: Title prefix (case-sensitive)
+            limit: Maximum number of titles
+            
+        Returns:
+            Matching titles in order
+        """
+        return self._open_search().prefix(prefix, limit)
     
-    def get_total_articles_count(self) -> int:
-        """Get the total number of articles in the database"""
+    def get_total_articles_count(self, exact: bool = False) -> int:
+        """
+        Get the total number of articles in the database
+        
+        Args:
+            exact: Count the table rows instead of reading the maintained counter
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM articles")
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+            return self.store.count(exact)
         except sqlite3.Error:
             return 0
     
     def get_last_article_title(self) -> Optional[str]:
         """Get the last article title from the database (alphabetically)"""
         try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT title FROM articles ORDER BY title DESC LIMIT 1")
-            result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else None
+            return self.store.last_title()
         except sqlite3.Error:
             return None
     
-    def create_resume_url(self, last_title: str) -> str:
-        """Create a resume URL from the last article title"""
-        from urllib.parse import quote_plus
-        # URL encode the title for use in the from parameter
-        encoded_title = quote_plus(last_title)
-        return f"https://en.wikipedia.org/w/index.php?title=Special:AllPages&from={encoded_title}"
+    def create_resume_url(self, last_title: str, to_title: Optional[str] = None) -> str:
+        """Create a resume URL from the last article title, optionally bounded by to_title"""
+        return self.source.start_url(last_title, to_title)
+    
+    def has_checkpoint(self) -> bool:
+        """Whether an earlier crawl left unfinished ranges that scrape_all_articles() resumes"""
+        try:
+            return bool(self.store.pending_ranges())
+        except sqlite3.Error:
+            return False
     
-    def scrape_all_articles(self, start_url: str = None, max_pages: int = None):
+    def plan_crawl_ranges(self, partitions: int) -> List[Tuple[int, str]]:
         """
-        Scrape all Wikipedia articles starting from the given URL
+        Split the title space into ranges, or pick up unfinished ranges of an earlier run
+        
+        Ranges are persisted in the crawl_ranges table together with the URL of
+        their next unfetched page, so an interrupted run resumes each range independently.
         
         Args:
-            start_url: Starting URL (default: Special:AllPages from '!')
-            max_pages: Maximum number of pages to scrape (None for all pages)
+            partitions: Number of ranges for a fresh plan
+            
+        Returns:
+            List of (range_id, next page URL) for every unfinished range
         """
-        if start_url is None:
-            start_url = "https://en.wikipedia.org/w/index.php?title=Special:AllPages&from=%21"
+        pending = self.store.pending_ranges()
+        if pending:
+            logger.info(f"Resuming {len(pending)} unfinished crawl range(s)")
+            # Each range restarts at its cursor, which is also where a parked page of it failed
+            self.store.drop_failed_pages([range_id for range_id, _ in pending])
+            return pending
         
-        current_url = start_url
+        # Use quantiles of already stored titles when there are enough of them
+        boundaries = None
+        count = self.get_total_articles_count()
+        router = getattr(self.store, 'router', None)
+        if router is not None and router.ordered and partitions == router.shards:
+            # One range per shard, so each range worker writes a single shard file
+            boundaries = router.boundaries
+        elif count >= partitions * 1000:
+            boundaries = [self.store.title_at(count * i // partitions) for i in range(1, partitions)]
+        
+        ranges = plan_ranges(partitions, boundaries)
+        planned = self.store.replace_ranges(
+            [(start, end, self.create_resume_url(start, end)) for start, end in ranges]
+        )
+        for (range_id, _), (start, end) in zip(planned, ranges):
+            logger.info(f"Range {range_id}: '{start}' to '{end or '(end)'}'")
+        return planned
+    
+    def _update_range_cursor(self, range_id: Optional[int], next_url: Optional[str]):
+        """Record the next page of a persisted range (None marks the range as done)"""
+        if range_id is None:
+            return
+        if self.writer is not None:
+            self.writer.update_range_cursor(range_id, next_url)
+            return
+        try:
+            self.store.update_range_cursor(range_id, next_url)
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+    
+    def _record_failed_page(self, url: str, range_id: Optional[int] = None):
+        """Park a page whose retries were exhausted so it is retried later instead of aborting"""
+        if url in self._unretryable:
+            # The range keeps its cursor, so the next run tries the page once more
+            logger.warning(f"Not queueing {url} for a retry: the server rejected it with a client error")
+            return
+        try:
+            self.store.add_failed_page(url, range_id)
+            logger.warning(f"Queued failed page for a later retry: {url}")
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+    
+    def _take_failed_pages(self) -> List[Tuple[Optional[int], str]]:
+        """Remove and return all parked pages as (range_id, url) crawl ranges"""
+        return self.store.take_failed_pages()
+    
+    def retry_failed_pages(self, rounds: int = 1, cooldown: float = 60.0) -> int:
+        """
+        Continue crawling from every parked page
+        
+        Each page is the cursor of an interrupted range, so retrying it walks
+        the rest of that range. Pages failing again are parked once more.
+        
+        Args:
+            rounds: Maximum number of passes over the failed-page queue
+            cooldown: Seconds to wait before each pass
+            
+        Returns:
+            Number of pages scraped
+        """
         pages_scraped = 0
-        total_articles = 0
+        for round_number in range(rounds):
+            if self._pages_remaining is not None and self._pages_remaining <= 0:
+                break
+            failed = self._take_failed_pages()
+            if not failed:
+                break
+            logger.info(f"Retrying {len(failed)} failed page(s) in {cooldown:.0f}s "
+                        f"(round {round_number + 1}/{rounds})")
+            time.sleep(cooldown)
+            pages_scraped += self._run_ranges(failed)
+        return pages_scraped
+    
+    def _claim_page(self) -> bool:
+        """Reserve one page from the max_pages budget shared by all range workers"""
+        with self._pages_lock:
+            if self._pages_remaining is None:
+                return True
+            if self._pages_remaining <= 0:
+                return False
+            self._pages_remaining -= 1
+            return True
+    
+    def _crawl_range(self, start_url: str, range_id: Optional[int] = None) -> int:
+        """
+        Walk one range page by page until it has no next link
         
-        logger.info(f"Starting Wikipedia article scraping from: {start_url}")
+        Args:
+            start_url: First page to fetch
+            range_id: Persisted range to checkpoint (None for an ad-hoc crawl)
+            
+        Returns:
+            Number of pages scraped
+        """
+        current_url = start_url
+        pages_scraped = 0
         
         while current_url:
-            if max_pages and pages_scraped >= max_pages:
-                logger.info(f"Reached maximum page limit: {max_pages}")
+            if self._stop.is_set():
+                break
+            if not self._claim_page():
+                logger.info("Reached maximum page limit")
                 break
             
-            soup = self._get_page(current_url)
-            if not soup:
-                logger.error(f"Failed to fetch page, stopping scraping")
+            page = self._fetch_and_parse(current_url)
+            if page is None:
+                # A fetch cut short by a stop is not a failure; the range cursor still points at it
+                if not self._stop.is_set():
+                    self._record_failed_page(current_url, range_id)
                 break
             
-            # Extract articles from current page
-            articles = self._extract_articles_from_page(soup)
+            # Articles and the next page link of the current page
+            articles, next_url = page
             if not articles:
                 logger.warning("No articles found on this page, stopping")
                 break
@@ -249,20 +700,96 @@ class WikipediaScraper:
             self._save_articles_to_db(articles)
             
             pages_scraped += 1
-            total_articles += len(articles)
             
             # Get current count from database
             db_count = self.get_total_articles_count()
             logger.info(f"Page {pages_scraped} completed. Total articles in DB: {db_count}")
             
-            # Find next page
-            current_url = self._find_next_page_url(soup)
+            current_url = next_url
+            self._update_range_cursor(range_id, current_url)
             if not current_url:
                 logger.info("No more pages found, scraping completed")
                 break
         
-        final_count = self.get_total_articles_count()
+        return pages_scraped
+    
+    def _run_ranges(self, ranges: List[Tuple[Optional[int], str]]) -> int:
+        """
+        Crawl ranges with the configured engine
+        
+        Args:
+            ranges: (range_id, first page URL) of each range
+            
+        Returns:
+            Number of pages scraped
+        """
+        if self.engine == 'async':
+            from async_engine import AsyncCrawlEngine
+            return AsyncCrawlEngine(self, concurrency=self.concurrency).run(ranges)
+        
+        if self.engine == 'pipeline':
+            from pipeline import CrawlPipeline
+            logger.info(f"Starting pipelined scraping of {len(ranges)} range(s)")
+            pipeline = CrawlPipeline(self, parse_queue_size=self.queue_size, write_queue_size=self.queue_size,
+                                     parser_threads=max(1, self.parse_workers))
+            return pipeline.run(ranges)
+        
+        if len(ranges) == 1:
+            logger.info(f"Starting Wikipedia article scraping from: {ranges[0][1]}")
+            return self._crawl_range(ranges[0][1], ranges[0][0])
+        
+        # One worker thread per range, all drawing from the shared rate limiter
+        logger.info(f"Starting Wikipedia article scraping of {len(ranges)} ranges")
+        executor = ThreadPoolExecutor(max_workers=len(ranges))
+        try:
+            futures = [executor.submit(self._crawl_range, url, range_id) for range_id, url in ranges]
+            return sum(future.result() for future in futures)
+        except BaseException:
+            # KeyboardInterrupt (also raised for SIGTERM) or a failed worker: stop the other ranges
+            self._stop.set()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def scrape_all_articles(self, start_url: str = None, max_pages: int = None, partitions: int = 1,
+                            retry_rounds: int = 3):
+        """
+        Scrape all Wikipedia articles starting from the given URL
+        
+        Every crawl is checkpointed in crawl_ranges: the next page URL of each
+        range is committed together with the titles of the pages before it.
+        
+        Args:
+            start_url: Starting URL; replaces any unfinished crawl (default: resume the
+                unfinished ranges of an earlier run, or start a new crawl from '!')
+            max_pages: Maximum number of pages to scrape (None for all pages)
+            partitions: Number of key ranges walked in parallel when no start_url is given
+                (the async engine plans at least `concurrency` ranges)
+            retry_rounds: Passes over pages that failed all attempts, after the main crawl
+        """
+        self._stop.clear()
+        if start_url is None:
+            if self.engine == 'async' and partitions < self.concurrency:
+                # A range is walked one page at a time, so each in-flight request needs its own range
+                logger.info(f"Planning {self.concurrency} ranges to match the async concurrency")
+                partitions = self.concurrency
+            ranges = self.plan_crawl_ranges(partitions)
+        else:
+            ranges = self.store.replace_ranges([(self.source.start_title(start_url), None, start_url)])
+        if self.engine == 'async' and len(ranges) < self.concurrency:
+            logger.warning(f"Only {len(ranges)} range(s) to crawl: at most {len(ranges)} of the "
+                           f"{self.concurrency} concurrent requests can be in flight")
+        
+        self._pages_remaining = max_pages
+        pages_scraped = self._run_ranges(ranges)
+        self.flush_writes()
+        pages_scraped += self.retry_failed_pages(rounds=retry_rounds, cooldown=self.retry_policy.max_delay)
+        self.flush_writes()
+        
+        final_count = self.get_total_articles_count(exact=True)
         logger.info(f"Scraping completed! Total pages scraped: {pages_scraped}")
+        if self.store.dedup_filter_bytes > 0:
+            logger.info(f"Already stored titles skipped by the dedup filter: {self.store.skipped_titles}")
         logger.info(f"Total articles in database: {final_count}")
 
 
@@ -273,13 +800,135 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Wikipedia Article Scraper')
     parser.add_argument('--start-from', type=str, help='Starting page/article name to scrape from (e.g., "2004DW")')
-    parser.add_argument('--resume', action='store_true', help='Automatically resume from the last article in database')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume the saved crawl checkpoint (or the last article in older databases)')
     parser.add_argument('--max-pages', type=int, help='Maximum number of pages to scrape')
+    parser.add_argument('--engine', choices=WikipediaScraper.ENGINES, default='sync',
+                        help='Crawl engine: sync (one request at a time), async (concurrent) '
+                             'or pipeline (overlapped fetch/parse/store stages)')
+    parser.add_argument('--partitions', type=int, default=1,
+                        help='Split the title space into N ranges crawled in parallel (resumes unfinished ranges)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Maximum in-flight requests for the async engine (a fresh crawl plans '
+                             'at least this many ranges)')
+    parser.add_argument('--rate', type=float, help='Requests per second across all workers (default: 1)')
+    parser.add_argument('--burst', type=int, default=1, help='Requests allowed back to back after an idle period')
+    parser.add_argument('--adaptive', action='store_true', help='Slow down on HTTP 429/503 and recover when healthy')
+    parser.add_argument('--max-attempts', type=int, default=5,
+                        help='Attempts per page with exponential backoff before it is queued for a later retry')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Only continue crawling from pages that failed in earlier runs')
+    parser.add_argument('--cache-dir', type=str, help='Directory of a persistent compressed response cache')
+    parser.add_argument('--cache-max-mb', type=int, default=2048, help='Response cache size limit in MiB')
+    parser.add_argument('--offline', action='store_true',
+                        help='Rebuild the database from the response cache only (requires --cache-dir) and exit')
+    parser.add_argument('--queue-size', type=int, default=8, help='Bounded queue depth between pipeline stages')
+    parser.add_argument('--backend', choices=tuple(SOURCES), default='html',
+                        help='Title source: html (Special:AllPages) or api (api.php list=allpages, 500 titles/request)')
+    parser.add_argument('--parser', choices=tuple(PARSERS), default='html.parser',
+                        help='HTML parser backend for the html source (see bench_parsers.py for speed)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Worker processes for HTML parsing (0 parses in the main process)')
+    parser.add_argument('--storage-profile', choices=tuple(STORAGE_PROFILES), default='fast-bulk',
+                        help='SQLite tuning: durable (synchronous=FULL) or fast-bulk (synchronous=NORMAL, large cache)')
+    parser.add_argument('--commit-rows', type=int, default=10000,
+                        help='Group commit once this many new titles are pending (1 commits every page)')
+    parser.add_argument('--commit-interval', type=float, default=2.0,
+                        help='Group commit at least every N seconds while pages are being saved')
+    parser.add_argument('--no-background-writer', action='store_true',
+                        help='Write to SQLite in the crawl loop instead of on a dedicated writer thread')
+    parser.add_argument('--writer-queue-size', type=int, default=64,
+                        help='Pages queued for the background writer before crawling blocks')
+    parser.add_argument('--from-dump', type=str, metavar='PATH',
+                        help='Rebuild the database offline from a title dump (all-titles-in-ns0.gz/.bz2) and exit')
+    parser.add_argument('--export-archive', type=str, metavar='PATH',
+                        help='Write all titles to a compact front-coded title archive and exit')
+    parser.add_argument('--import-archive', type=str, metavar='PATH',
+                        help='Load all titles of a title archive into the database and exit')
+    parser.add_argument('--bulk-load', action='store_true',
+                        help='With --from-dump/--offline: stage titles unindexed and build the title index '
+                             'in one sorted pass at the end (fastest for from-scratch builds)')
+    parser.add_argument('--layout', choices=tuple(ARTICLE_LAYOUTS),
+                        help='Articles table layout for a new database: rowid (id + UNIQUE title, default) '
+                             'or title (WITHOUT ROWID keyed on the title, about half the size)')
+    parser.add_argument('--migrate-layout', action='store_true',
+                        help='Convert an existing articles table to --layout (rewrites and vacuums the database)')
+    parser.add_argument('--search-index', action='store_true',
+                        help='Build a trigram full-text index over titles, kept in sync while crawling '
+                             '(query it with title_search.py)')
+    parser.add_argument('--dedup-filter-mb', type=int, default=0,
+                        help='Keep a filter of stored titles in memory (budget in MiB) so recrawled '
+                             'titles skip the INSERT; 0 disables it')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='Spread titles over N database files, each with its own writer thread '
+                             '(new databases only; inspect them with sharding.py)')
+    parser.add_argument('--shard-by', choices=SHARD_SCHEMES, default='first-char',
+                        help='Route titles to shards by title range (first-char) or by hash')
+    parser.add_argument('--ingest-log', type=str, metavar='PATH',
+                        help='Append parsed pages to a crash-safe log replayed into SQLite in sorted batches '
+                             '(a log left by a crash is replayed on the next start)')
+    parser.add_argument('--base-url', type=str, default='https://en.wikipedia.org',
+                        help='Wiki to scrape (e.g. a local stand-in from mock_wiki.py)')
     args = parser.parse_args()
+    if args.commit_interval <= 0:
+        parser.error("--commit-interval must be positive (--commit-rows 1 commits every page)")
     
+    # Treat SIGTERM like Ctrl+C so the pending group commit is flushed on shutdown
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
+    scraper = None
     try:
         # Create scraper instance
-        scraper = WikipediaScraper(db_name="wikipedia_articles.db", delay=1.0)
+        scraper = WikipediaScraper(db_name="wikipedia_articles.db", delay=1.0, base_url=args.base_url,
+                                   engine=args.engine, concurrency=args.concurrency, backend=args.backend,
+                                   queue_size=args.queue_size, rate=args.rate, burst=args.burst,
+                                   adaptive=args.adaptive, max_attempts=args.max_attempts,
+                                   cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 ** 2,
+                                   parser=args.parser, parse_workers=args.parse_workers,
+                                   storage_profile=args.storage_profile, commit_rows=args.commit_rows,
+                                   commit_interval=args.commit_interval,
+                                   background_writer=not args.no_background_writer,
+                                   writer_queue_size=args.writer_queue_size, layout=args.layout,
+                                   migrate_layout=args.migrate_layout, search_index=args.search_index,
+                                   dedup_filter_bytes=args.dedup_filter_mb * 1024 ** 2,
+                                   shards=args.shards, shard_by=args.shard_by, ingest_log=args.ingest_log)
+        
+        if args.from_dump:
+            inserted = scraper.ingest_dump(args.from_dump, bulk=args.bulk_load)
+            print(f"\n=== Dump Ingest Summary ===")
+            print(f"New articles saved: {inserted}")
+            print(f"Total articles in database: {scraper.get_total_articles_count()}")
+            return
+        
+        if args.export_archive:
+            exported = scraper.export_archive(args.export_archive)
+            print(f"\n=== Archive Export Summary ===")
+            print(f"Titles exported: {exported}")
+            print(f"Archive file: {args.export_archive}")
+            return
+        
+        if args.import_archive:
+            inserted = scraper.import_archive(args.import_archive)
+            print(f"\n=== Archive Import Summary ===")
+            print(f"New articles saved: {inserted}")
+            print(f"Total articles in database: {scraper.get_total_articles_count()}")
+            return
+        
+        if args.offline:
+            if not args.cache_dir:
+                parser.error("--offline requires --cache-dir")
+            pages = scraper.rebuild_from_cache(bulk=args.bulk_load)
+            print(f"\n=== Offline Rebuild Summary ===")
+            print(f"Cached pages parsed: {pages}")
+            print(f"Total articles in database: {scraper.get_total_articles_count()}")
+            return
+        
+        if args.retry_failed:
+            pages = scraper.retry_failed_pages(cooldown=0)
+            print(f"\n=== Retry Summary ===")
+            print(f"Pages scraped: {pages}")
+            print(f"Total articles in database: {scraper.get_total_articles_count()}")
+            return
         
         # Check if we already have articles
         existing_count = scraper.get_total_articles_count()
@@ -291,27 +940,37 @@ def main():
             if last_title:
                 logger.info(f"Last article in database: '{last_title}'")
         
-        # Determine starting URL
+        # Determine starting URL (None resumes the checkpoint of an interrupted crawl)
         start_url = None
+        checkpoint = scraper.has_checkpoint()
         if args.start_from:
-            start_url = f"https://en.wikipedia.org/w/index.php?title=Special:AllPages&from={args.start_from}"
+            start_url = scraper.create_resume_url(args.start_from)
             logger.info(f"Starting from article: {args.start_from}")
+        elif args.resume and checkpoint:
+            logger.info("Resuming from the saved crawl checkpoint")
         elif args.resume and existing_count > 0:
             last_title = scraper.get_last_article_title()
             if last_title:
                 start_url = scraper.create_resume_url(last_title)
-                logger.info(f"Resuming from last article: '{last_title}'")
+                logger.info(f"No checkpoint found, resuming from last article: '{last_title}'")
             else:
                 logger.warning("Could not get last article title, starting from beginning")
+        elif args.partitions > 1:
+            logger.info(f"Crawling in {args.partitions} partitions")
         else:
-            if existing_count > 0:
+            if checkpoint or existing_count > 0:
                 response = input("Continue scraping from where we left off? (y/n): ").lower()
                 if response == 'y':
-                    last_title = scraper.get_last_article_title()
-                    if last_title:
-                        start_url = scraper.create_resume_url(last_title)
-                        logger.info(f"Resuming from last article: '{last_title}'")
-                elif response != 'n':
+                    if checkpoint:
+                        logger.info("Resuming from the saved crawl checkpoint")
+                    else:
+                        last_title = scraper.get_last_article_title()
+                        if last_title:
+                            start_url = scraper.create_resume_url(last_title)
+                            logger.info(f"Resuming from last article: '{last_title}'")
+                elif response == 'n':
+                    start_url = scraper.create_resume_url('!')
+                else:
                     logger.info("Scraping cancelled by user")
                     return
         
@@ -319,7 +978,7 @@ def main():
         logger.info("Starting Wikipedia article scraping...")
         logger.info("This will scrape Wikipedia articles. Press Ctrl+C to stop.")
         
-        scraper.scrape_all_articles(start_url=start_url, max_pages=args.max_pages)
+        scraper.scrape_all_articles(start_url=start_url, max_pages=args.max_pages, partitions=args.partitions)
         
         # Show final statistics
         total_count = scraper.get_total_articles_count()
@@ -332,6 +991,9 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise
+    finally:
+        if scraper is not None:
+            scraper.close()
 
 
 if __name__ == "__main__":
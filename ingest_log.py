@@ -0,0 +1,270 @@
+"""
+Ingest Log
+
+Append-only, checksummed log of parsed pages that sits in front of SQLite.
+Crawl loops append the titles and range checkpoint of every page as framed
+records; a compactor thread replays sealed log segments into the database in
+large sorted batches and deletes them once committed. Fetching therefore
+runs at the speed of sequential appends, and a page is safe as soon as its
+record is written, even if the process dies mid-commit: leftover segments
+are replayed when the log is opened again.
+
+Segment layout::
+
+    header   MAGIC
+    records  length (uint32), CRC32 of the payload (uint32), payload
+
+A payload is UTF-8 JSON, either ``{"titles": [...]}`` or
+``{"range": id, "next": url}``. A record cut short by a crash, or failing
+its checksum, ends the segment; it can only be the last one written.
+
+Replaying a segment inserts its titles first and applies its checkpoints
+afterwards, so a checkpoint never commits ahead of the titles of its pages;
+INSERT OR IGNORE makes replaying a segment twice harmless.
+"""
+
+import glob
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, List, Optional
+
+from storage import WriterError
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'WIL1'
+# payload length, CRC32 of the payload
+_FRAME = struct.Struct('<II')
+
+
+def segment_paths(path: str) -> List[str]:
+    """Existing segments of a log, oldest first"""
+    return sorted(glob.glob(f"{glob.escape(path)}.[0-9][0-9][0-9][0-9][0-9][0-9]"))
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """
+    Records of one segment, up to the first torn or corrupt record
+
+    Args:
+        path: Segment file
+
+    Yields:
+        Decoded record payloads
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            logger.warning(f"Ignoring '{path}': not an ingest log segment")
+            return
+        while True:
+            offset = f.tell()
+            frame = f.read(_FRAME.size)
+            if not frame:
+                return
+            if len(frame) == _FRAME.size:
+                length, checksum = _FRAME.unpack(frame)
+                payload = f.read(length)
+                if len(payload) == length and zlib.crc32(payload) == checksum:
+                    yield json.loads(payload)
+                    continue
+            size = os.path.getsize(path)
+            logger.warning(f"Discarding {size - offset} bytes of a torn record at the end of '{path}'")
+            return
+
+
+def replay_segment(store, path: str, batch_size: int = 100000) -> int:
+    """
+    Apply the records of a segment to an ArticleStore and commit them
+
+    Titles are inserted in sorted batches; the last checkpoint of every range
+    is applied after all titles of the segment.
+
+    Args:
+        store: ArticleStore (or ShardedArticleStore) of the database
+        path: Segment file
+        batch_size: Titles per sorted INSERT batch
+
+    Returns:
+        Number of new articles inserted
+    """
+    started = time.monotonic()
+    records = 0
+    titles = []
+    cursors = {}
+    for record in read_segment(path):
+        records += 1
+        if 'titles' in record:
+            titles.extend(record['titles'])
+        else:
+            cursors[record['range']] = record['next']
+
+    # Sorting keeps the inserts of a batch close together in the title B-tree
+    titles.sort()
+    inserted = 0
+    for i in range(0, len(titles), batch_size):
+        inserted += store.save_titles(titles[i:i + batch_size])
+    for range_id, next_url in cursors.items():
+        store.update_range_cursor(range_id, next_url)
+    store.flush()
+    logger.info(f"Replayed {records} log records ({len(titles)} titles, {inserted} new) from "
+                f"'{os.path.basename(path)}' in {time.monotonic() - started:.1f}s")
+    return inserted
+
+
+def replay_log(store, path: str, batch_size: int = 100000) -> int:
+    """
+    Replay and delete every segment of a log, oldest first
+
+    Args:
+        store: ArticleStore of the database
+        path: Log path (segments are '<path>.NNNNNN')
+        batch_size: Titles per sorted INSERT batch
+
+    Returns:
+        Number of new articles inserted
+    """
+    inserted = 0
+    for segment in segment_paths(path):
+        inserted += replay_segment(store, segment, batch_size)
+        os.remove(segment)
+    return inserted
+
+
+class IngestLog:
+    """Writer that logs pages to disk and replays them into SQLite on a compactor thread"""
+
+    def __init__(self, store, path: str, segment_bytes: int = 64 * 1024 ** 2, seal_interval: float = 60.0,
+                 fsync: bool = False, batch_size: int = 100000):
+        """
+        Replay segments left by an earlier run and open a new segment
+
+        Args:
+            store: ArticleStore the log is replayed into
+            path: Log path; segments are written to '<path>.NNNNNN'
+            segment_bytes: Size at which a segment is sealed and handed to the compactor
+            seal_interval: Seconds after its first record at which a smaller segment is sealed,
+                bounding how far the database lags behind the log
+            fsync: fsync every record (survives power loss) instead of only
+                writing it to the OS (survives a crash of the process)
+            batch_size: Titles per sorted INSERT batch during replay
+        """
+        self.store = store
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.seal_interval = seal_interval
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.records = 0
+        self._error = None
+        self._lock = threading.Lock()
+        # Sealed segments waiting for the compactor
+        self._sealed = []
+        self._wakeup = threading.Condition()
+
+        leftover = segment_paths(path)
+        if leftover:
+            logger.info(f"Recovering {len(leftover)} ingest log segment(s) of an earlier run")
+            replay_log(store, path, batch_size)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._number = 0
+        self._file = None
+        self._open_segment()
+
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name='ingest-log-compactor', daemon=True)
+        self._thread.start()
+
+    def _open_segment(self):
+        self._number += 1
+        self._segment = f"{self.path}.{self._number:06d}"
+        self._file = open(self._segment, 'wb')
+        self._file.write(MAGIC)
+        self._opened = None
+
+    def _seal(self):
+        """Close the current segment, queue it for replay and start the next one (holds _lock)"""
+        if self._file.tell() == len(MAGIC):
+            return
+        self._file.close()
+        with self._wakeup:
+            self._sealed.append(self._segment)
+            self._wakeup.notify()
+        self._open_segment()
+
+    def _append(self, record: dict):
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        frame = _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            self._check()
+            self._file.write(frame)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.records += 1
+            if self._opened is None:
+                self._opened = time.monotonic()
+            if (self._file.tell() >= self.segment_bytes
+                    or time.monotonic() - self._opened >= self.seal_interval):
+                self._seal()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._sealed and not self._closing:
+                    self._wakeup.wait()
+                if not self._sealed:
+                    return
+                segment = self._sealed[0]
+            try:
+                if self._error is None:
+                    replay_segment(self.store, segment, self.batch_size)
+                    os.remove(segment)
+            except Exception as e:
+                # The segment stays on disk and is replayed by the next run
+                logger.error(f"Ingest log replay failed: {e}")
+                self._error = e
+            with self._wakeup:
+                self._sealed.pop(0)
+                self._wakeup.notify_all()
+
+    def _check(self):
+        if self._error is not None:
+            raise WriterError(f"Ingest log replay failed: {self._error}") from self._error
+
+    def save_titles(self, titles: List[str]):
+        """Log the titles of a page"""
+        self._append({'titles': titles})
+
+    def update_range_cursor(self, range_id: int, next_url: Optional[str]):
+        """Log a range checkpoint; it is replayed after the titles logged before it"""
+        self._append({'range': range_id, 'next': next_url})
+
+    def flush(self):
+        """Seal the current segment and wait until every segment is replayed and committed"""
+        with self._lock:
+            self._seal()
+        with self._wakeup:
+            while self._sealed:
+                self._wakeup.wait()
+        self._check()
+
+    def close(self):
+        """Replay outstanding records and stop the compactor"""
+        with self._lock:
+            self._seal()
+            self._file.close()
+            os.remove(self._segment)
+        with self._wakeup:
+            self._closing = True
+            self._wakeup.notify_all()
+        self._thread.join()
+        if self._error is not None:
+            logger.error(f"Ingest log stopped after a failed replay: {self._error}")
+
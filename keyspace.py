@@ -0,0 +1,87 @@
+"""
+Keyspace Partitioning
+
+Splits the Special:AllPages title space into contiguous ``from``/``to`` ranges
+so each range can be walked by its own worker.
+"""
+
+from typing import List, Optional, Tuple
+
+
+# Approximate share of English Wikipedia article titles by first character.
+# Used to place range boundaries when no sample of real titles is available.
+FIRST_CHAR_WEIGHTS = [
+    ('!', 0.5), ('0', 3.0), ('A', 6.5), ('B', 6.0), ('C', 7.0), ('D', 4.5),
+    ('E', 3.0), ('F', 3.5), ('G', 4.0), ('H', 4.0), ('I', 2.5), ('J', 2.5),
+    ('K', 3.0), ('L', 4.0), ('M', 7.0), ('N', 3.0), ('O', 2.0), ('P', 6.0),
+    ('Q', 0.3), ('R', 4.0), ('S', 9.0), ('T', 5.0), ('U', 1.3), ('V', 2.0),
+    ('W', 3.0), ('X', 0.2), ('Y', 0.5), ('Z', 0.6), ('À', 1.0)
+]
+
+_SECOND_CHARS = 'abcdefghijklmnopqrstuvwxyz'
+
+TitleRange = Tuple[str, Optional[str]]
+
+
+def default_boundaries(partitions: int) -> List[str]:
+    """
+    Estimate ``partitions - 1`` boundary titles from first-character weights
+
+    Boundaries inside a heavy first character are refined with a second
+    lowercase character, so more partitions than letters still balance.
+
+    Args:
+        partitions: Number of ranges wanted
+
+    Returns:
+        Sorted list of distinct boundary titles
+    """
+    total = sum(weight for _, weight in FIRST_CHAR_WEIGHTS)
+    boundaries = []
+
+    for i in range(1, partitions):
+        target = total * i / partitions
+        cumulative = 0.0
+        for char, weight in FIRST_CHAR_WEIGHTS:
+            if cumulative + weight >= target:
+                fraction = (target - cumulative) / weight
+                index = int(fraction * len(_SECOND_CHARS))
+                boundary = char if index == 0 else char + _SECOND_CHARS[min(index, len(_SECOND_CHARS) - 1)]
+                break
+            cumulative += weight
+        else:
+            boundary = FIRST_CHAR_WEIGHTS[-1][0]
+
+        if not boundaries or boundary > boundaries[-1]:
+            boundaries.append(boundary)
+
+    return boundaries
+
+
+def plan_ranges(partitions: int, boundaries: Optional[List[str]] = None,
+                first_title: str = '!') -> List[TitleRange]:
+    """
+    Split the title space into contiguous ranges
+
+    Special:AllPages treats ``to`` as inclusive, so a boundary title may be
+    listed by two neighbouring ranges; INSERT OR IGNORE absorbs the overlap.
+
+    Args:
+        partitions: Number of ranges wanted
+        boundaries: Explicit sorted boundary titles, e.g. quantiles of stored titles
+            (default: estimated from first-character weights)
+        first_title: ``from`` value of the first range
+
+    Returns:
+        List of (from_title, to_title) tuples; the last range has no upper bound
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1")
+
+    if boundaries is None:
+        boundaries = default_boundaries(partitions)
+    boundaries = [b for b in boundaries if b > first_title]
+
+    starts = [first_title] + boundaries
+    ends = boundaries + [None]
+    return list(zip(starts, ends))
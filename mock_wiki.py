@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Local Wikipedia Stand-in
+
+Serves synthetic Special:AllPages HTML and api.php list=allpages JSON from a
+local HTTP server so the scraper engines and source backends can be exercised
+and benchmarked without touching Wikipedia.
+"""
+
+import html
+import json
+import random
+import threading
+import time
+import logging
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote_plus
+from bisect import bisect_left
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_WORDS = [
+    "Abbey", "Battle", "Castle", "District", "Echo", "Festival", "Garden",
+    "Harbour", "Island", "Junction", "Kingdom", "Lake", "Mountain", "North",
+    "Observatory", "Palace", "Quarry", "River", "Station", "Tower", "Union",
+    "Valley", "Waterfall", "Xylophone", "Yard", "Zone"
+]
+
+
+def generate_titles(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate a sorted list of unique, Wikipedia-like article titles
+
+    Titles share long prefixes the way real AllPages listings do.
+
+    Args:
+        count: Number of titles to generate
+        seed: Random seed so corpora are reproducible
+
+    Returns:
+        Sorted list of unique titles
+    """
+    rng = random.Random(seed)
+    titles = set()
+    while len(titles) < count:
+        words = rng.sample(_WORDS, rng.randint(1, 3))
+        suffix = rng.choice(["", f" ({rng.randint(1800, 2024)})", f" {rng.randint(1, 999)}"])
+        titles.add(" ".join(words) + suffix)
+    return sorted(titles)
+
+
+def render_allpages_html(titles: List[str], next_title: Optional[str] = None) -> str:
+    """
+    Render one Special:AllPages result page
+
+    Like MediaWiki, the next link only carries ``from``: a ``to`` bound of the
+    request is not repeated in it.
+
+    Args:
+        titles: Titles listed on this page
+        next_title: First title of the next page, if any
+
+    Returns:
+        HTML document mirroring the structure of the real page
+    """
+    items = "\n".join(
+        f'<li><a href="/wiki/{quote_plus(t.replace(" ", "_"))}" title="{html.escape(t)}">'
+        f'{html.escape(t)}</a></li>'
+        for t in titles
+    )
+    nav = ""
+    if next_title is not None:
+        href = f"/w/index.php?title=Special:AllPages&from={quote_plus(next_title)}"
+        nav = (f'<div class="mw-allpages-nav"><a href="{html.escape(href)}" '
+               f'title="Special:AllPages">Next page ({html.escape(next_title)})</a></div>')
+    sidebar = "\n".join(f'<li><a href="/wiki/Portal:{w}" title="Portal:{w}">{w}</a></li>' for w in _WORDS)
+    return f"""<!DOCTYPE html>
+<html><head><title>All pages - Wikipedia</title></head>
+<body>
+<div id="mw-navigation"><ul>{sidebar}</ul></div>
+<div id="content" class="mw-body">
+<h1>All pages</h1>
+{nav}
+<div class="mw-allpages-body"><ul class="mw-allpages-chunk">
+{items}
+</ul></div>
+{nav}
+</div>
+<div id="footer"><a href="/wiki/Wikipedia:About" title="Wikipedia:About">About Wikipedia</a></div>
+</body></html>"""
+
+
+class MockWikiServer:
+    """Threaded HTTP server answering AllPages HTML and API requests from a title list"""
+
+    def __init__(self, titles: List[str], page_size: int = 345, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, api_limit: int = 500,
+                 failure_rate: float = 0.0):
+        """
+        Initialize the server
+
+        Args:
+            titles: Sorted titles the stand-in wiki contains
+            page_size: Titles per AllPages result page
+            latency: Artificial per-request latency in seconds
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            api_limit: Titles per API response for aplimit=max
+            failure_rate: Fraction of requests answered with HTTP 503 and Retry-After
+        """
+        self.titles = titles
+        self.page_size = page_size
+        self.latency = latency
+        self.api_limit = api_limit
+        self.failure_rate = failure_rate
+        self._rng = random.Random(0)
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests_served += 1
+                    fail = server._rng.random() < server.failure_rate
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if fail:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == "/w/index.php" and params.get("title") == "Special:AllPages":
+                    status, content_type, body = server._allpages(params)
+                elif parsed.path == "/w/api.php" and params.get("list") == "allpages":
+                    status, content_type, body = server._api_allpages(params)
+                else:
+                    status, content_type, body = 404, "text/plain", b"Not found"
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _bounds(self, from_title: str, to_title: Optional[str]):
+        """Index range of titles from ``from_title`` up to and including ``to_title``"""
+        start = bisect_left(self.titles, from_title)
+        end = len(self.titles)
+        if to_title:
+            end = bisect_left(self.titles, to_title)
+            if end < len(self.titles) and self.titles[end] == to_title:
+                end += 1
+        return start, end
+
+    def _allpages(self, params: dict):
+        """Serve one page of the listing starting at ``from`` and bounded by ``to``"""
+        start, end = self._bounds(params.get("from", ""), params.get("to"))
+
+        stop = min(start + self.page_size, end)
+        next_title = self.titles[stop] if stop < end else None
+        body = render_allpages_html(self.titles[start:stop], next_title)
+        return 200, "text/html; charset=UTF-8", body.encode("utf-8")
+
+    def _api_allpages(self, params: dict):
+        """Serve one list=allpages batch, continuing from ``apcontinue`` when given"""
+        from_title = params.get("apcontinue", params.get("apfrom", "")).replace("_", " ")
+        start, end = self._bounds(from_title, params.get("apto"))
+
+        limit = params.get("aplimit", "10")
+        limit = self.api_limit if limit == "max" else min(int(limit), self.api_limit)
+        stop = min(start + limit, end)
+
+        result = {
+            "batchcomplete": True,
+            "query": {"allpages": [{"pageid": i + 1, "ns": 0, "title": self.titles[i]}
+                                   for i in range(start, stop)]},
+        }
+        if stop < end:
+            result["continue"] = {"apcontinue": self.titles[stop].replace(" ", "_"), "continue": "-||"}
+        return 200, "application/json; charset=utf-8", json.dumps(result).encode("utf-8")
+
+    def start(self) -> "MockWikiServer":
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock wiki serving {len(self.titles)} titles at {self.base_url}")
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    """Run the stand-in wiki in the foreground"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local Wikipedia stand-in server')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--titles', type=int, default=100000, help='Number of synthetic titles')
+    parser.add_argument('--page-size', type=int, default=345, help='Titles per AllPages page')
+    parser.add_argument('--latency', type=float, default=0.0, help='Artificial latency per request (seconds)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    server = MockWikiServer(generate_titles(args.titles), page_size=args.page_size,
+                            latency=args.latency, port=args.port, failure_rate=args.failure_rate)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Special:AllPages HTML Parsers
+
+Interchangeable backends that extract the article titles and the next-page
+URL from one Special:AllPages response. All backends return identical
+results; they differ only in speed and in which optional package they need:
+
+- ``html.parser``: BeautifulSoup with the pure-Python parser (reference)
+- ``strainer``: BeautifulSoup that only builds the list and nav containers
+- ``lxml``: lxml.html DOM with XPath (needs ``lxml``)
+- ``selectolax``: Lexbor-based DOM with CSS selectors (needs ``selectolax``)
+- ``fast``: no DOM at all, string search over the raw document
+- ``stream``: event parser fed incrementally, e.g. while the response downloads
+"""
+
+import codecs
+import html
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+
+# (titles, next page URL) extracted from one page
+ParsedPage = Tuple[List[str], Optional[str]]
+
+BODY_CLASS = 'mw-allpages-body'
+NAV_CLASS = 'mw-allpages-nav'
+
+
+def extract_titles_from_soup(soup: BeautifulSoup) -> List[str]:
+    """Titles of the article links inside div.mw-allpages-body"""
+    content_div = soup.find('div', {'class': BODY_CLASS})
+    if not content_div:
+        return []
+
+    titles = []
+    for link in content_div.find_all('a'):
+        title = link.get('title')
+        href = link.get('href')
+        if title and href and href.startswith('/wiki/'):
+            titles.append(title)
+    return titles
+
+
+def find_next_page_url_in_soup(soup: BeautifulSoup, base_url: str) -> Optional[str]:
+    """URL of the "Next page" link, or None on the last page"""
+    # Look for "Next page" link
+    next_links = soup.find_all('a', string=lambda text: text and 'next' in text.lower())
+
+    for link in next_links:
+        href = link.get('href')
+        if href and 'Special:AllPages' in href:
+            return urljoin(base_url, href)
+
+    # Alternative: look for navigation links
+    nav_div = soup.find('div', {'class': NAV_CLASS})
+    if nav_div:
+        for link in nav_div.find_all('a'):
+            if 'next' in link.get_text().lower():
+                href = link.get('href')
+                if href:
+                    return urljoin(base_url, href)
+
+    return None
+
+
+def parse_html_parser(content: bytes, base_url: str) -> ParsedPage:
+    """Reference backend: BeautifulSoup with Python's html.parser"""
+    soup = BeautifulSoup(content, 'html.parser')
+    return extract_titles_from_soup(soup), find_next_page_url_in_soup(soup, base_url)
+
+
+# Only the article list and the navigation links are turned into tree nodes
+_ALLPAGES_STRAINER = SoupStrainer('div', attrs={'class': [BODY_CLASS, NAV_CLASS]})
+
+
+def parse_strainer(content: bytes, base_url: str) -> ParsedPage:
+    """
+    BeautifulSoup backend that skips everything but the two AllPages containers
+
+    Skins, sidebars and footers never become tree nodes, and titles and the
+    next link are collected in one pass over the retained anchors.
+    """
+    soup = BeautifulSoup(content, 'lxml' if lxml is not None else 'html.parser',
+                         parse_only=_ALLPAGES_STRAINER)
+
+    titles = []
+    next_url = None
+    seen_body = False
+    for container in soup.find_all('div', recursive=False):
+        classes = container.get('class') or []
+        in_body = BODY_CLASS in classes and not seen_body
+        in_nav = NAV_CLASS in classes and next_url is None
+        seen_body = seen_body or BODY_CLASS in classes
+
+        for link in container.find_all('a'):
+            href = link.get('href')
+            if not href:
+                continue
+            if in_body:
+                title = link.get('title')
+                if title and href.startswith('/wiki/'):
+                    titles.append(title)
+            if in_nav and next_url is None and 'next' in link.get_text().lower():
+                next_url = urljoin(base_url, href)
+
+    return titles, next_url
+
+
+def _has_class_xpath(class_name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {class_name} ")'
+
+
+def parse_lxml(content: bytes, base_url: str) -> ParsedPage:
+    """lxml.html backend"""
+    # Decode up front: without a <meta charset> lxml would guess Latin-1 for the bytes
+    doc = lxml.html.fromstring(content.decode('utf-8', errors='replace'))
+
+    titles = []
+    bodies = doc.xpath(f'//div[{_has_class_xpath(BODY_CLASS)}]')
+    if bodies:
+        for link in bodies[0].iter('a'):
+            title = link.get('title')
+            href = link.get('href')
+            if title and href and href.startswith('/wiki/'):
+                titles.append(title)
+
+    next_url = None
+    for link in doc.iter('a'):
+        href = link.get('href')
+        if href and 'Special:AllPages' in href and 'next' in link.text_content().lower():
+            next_url = urljoin(base_url, href)
+            break
+    else:
+        navs = doc.xpath(f'//div[{_has_class_xpath(NAV_CLASS)}]')
+        if navs:
+            for link in navs[0].iter('a'):
+                href = link.get('href')
+                if href and 'next' in link.text_content().lower():
+                    next_url = urljoin(base_url, href)
+                    break
+
+    return titles, next_url
+
+
+def parse_selectolax(content: bytes, base_url: str) -> ParsedPage:
+    """selectolax (Lexbor) backend"""
+    tree = SelectolaxParser(content)
+
+    titles = []
+    body = tree.css_first(f'div.{BODY_CLASS}')
+    if body is not None:
+        for link in body.css('a'):
+            title = link.attributes.get('title')
+            href = link.attributes.get('href')
+            if title and href and href.startswith('/wiki/'):
+                titles.append(title)
+
+    next_url = None
+    for link in tree.css('a'):
+        href = link.attributes.get('href')
+        if href and 'Special:AllPages' in href and 'next' in link.text().lower():
+            next_url = urljoin(base_url, href)
+            break
+    else:
+        nav = tree.css_first(f'div.{NAV_CLASS}')
+        if nav is not None:
+            for link in nav.css('a'):
+                href = link.attributes.get('href')
+                if href and 'next' in link.text().lower():
+                    next_url = urljoin(base_url, href)
+                    break
+
+    return titles, next_url
+
+
+_ANCHOR_RE = re.compile(r'<a\s([^>]*)>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+_NEXT_RE = re.compile(r'next', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+def _attributes(raw: str) -> Dict[str, str]:
+    attrs = {}
+    for match in _ATTR_RE.finditer(raw):
+        name = match.group(1).lower()
+        if name not in attrs:
+            value = next(group for group in match.groups()[1:] if group is not None)
+            attrs[name] = html.unescape(value)
+    return attrs
+
+
+def _find_class_div(doc: str, class_name: str) -> int:
+    """Offset just past the opening tag of the first div carrying class_name, or -1"""
+    for match in re.finditer(r'<div\s[^>]*class\s*=\s*["\']([^"\']*)["\'][^>]*>', doc, re.IGNORECASE):
+        if class_name in match.group(1).split():
+            return match.end()
+    return -1
+
+
+def parse_fast(content: bytes, base_url: str) -> ParsedPage:
+    """
+    No-DOM backend: scans the raw document for the two things we need
+
+    Relies on div.mw-allpages-body holding no nested divs, which is how
+    MediaWiki renders it (a ul of links).
+    """
+    doc = content.decode('utf-8', errors='replace')
+
+    titles = []
+    start = _find_class_div(doc, BODY_CLASS)
+    if start != -1:
+        end = doc.find('</div>', start)
+        for match in _ANCHOR_RE.finditer(doc, start, end if end != -1 else len(doc)):
+            attrs = _attributes(match.group(1))
+            title = attrs.get('title')
+            href = attrs.get('href')
+            if title and href and href.startswith('/wiki/'):
+                titles.append(title)
+
+    # "next" is rare in a listing, so locate it and check whether it sits inside a link
+    next_url = None
+    for match in _NEXT_RE.finditer(doc):
+        anchor_start = doc.rfind('<a ', 0, match.start())
+        if anchor_start == -1 or doc.rfind('</a>', anchor_start, match.start()) != -1:
+            continue
+        tag_end = doc.find('>', anchor_start)
+        if tag_end == -1 or tag_end > match.start():
+            continue
+        href = _attributes(doc[anchor_start + 3:tag_end]).get('href')
+        if href and 'Special:AllPages' in href:
+            next_url = urljoin(base_url, href)
+            break
+    else:
+        start = _find_class_div(doc, NAV_CLASS)
+        if start != -1:
+            end = doc.find('</div>', start)
+            nav = doc[start:end if end != -1 else len(doc)]
+            for match in re.finditer(r'<a\s([^>]*)>(.*?)</a>', nav, re.IGNORECASE | re.DOTALL):
+                href = _attributes(match.group(1)).get('href')
+                text = html.unescape(_TAG_RE.sub('', match.group(2)))
+                if href and 'next' in text.lower():
+                    next_url = urljoin(base_url, href)
+                    break
+
+    return titles, next_url
+
+
+class StreamingAllPagesParser(HTMLParser):
+    """
+    Event-driven extractor that accepts the document in arbitrary chunks
+
+    No tree is built: only the open containers and the anchor being read are
+    tracked, and titles become available as soon as their tag has arrived.
+    """
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.titles: List[str] = []
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._emitted = 0
+        self._div_stack: List[Optional[str]] = []
+        self._body_done = False
+        self._anchor: Optional[dict] = None
+        self._next_any: Optional[str] = None
+        self._next_nav: Optional[str] = None
+
+    @property
+    def next_url(self) -> Optional[str]:
+        """URL of the next page, known once the document has been fed completely"""
+        href = self._next_any or self._next_nav
+        return urljoin(self.base_url, href) if href else None
+
+    def _container(self) -> Optional[str]:
+        for kind in reversed(self._div_stack):
+            if kind is not None:
+                return kind
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            classes = (dict(attrs).get('class') or '').split()
+            kind = None
+            if BODY_CLASS in classes and not self._body_done:
+                kind = 'body'
+            elif NAV_CLASS in classes:
+                kind = 'nav'
+            self._div_stack.append(kind)
+        elif tag == 'a':
+            attrs = dict(attrs)
+            container = self._container()
+            href = attrs.get('href')
+            if container == 'body' and attrs.get('title') and href and href.startswith('/wiki/'):
+                self.titles.append(attrs['title'])
+            self._anchor = {'href': href, 'container': container, 'text': []}
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._anchor['text'].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'div' and self._div_stack:
+            if self._div_stack.pop() == 'body':
+                self._body_done = True
+        elif tag == 'a' and self._anchor is not None:
+            anchor, self._anchor = self._anchor, None
+            href = anchor['href']
+            if not href or 'next' not in ''.join(anchor['text']).lower():
+                return
+            if self._next_any is None and 'Special:AllPages' in href:
+                self._next_any = href
+            if self._next_nav is None and anchor['container'] == 'nav':
+                self._next_nav = href
+
+    def feed_bytes(self, chunk: bytes) -> List[str]:
+        """
+        Feed the next chunk of the raw document
+
+        Args:
+            chunk: Bytes in document order, split anywhere
+
+        Returns:
+            Titles completed since the previous call
+        """
+        self.feed(self._decoder.decode(chunk))
+        return self._take_new_titles()
+
+    def finish(self) -> List[str]:
+        """Flush the remaining input; returns titles completed by it"""
+        self.feed(self._decoder.decode(b'', final=True))
+        self.close()
+        return self._take_new_titles()
+
+    def _take_new_titles(self) -> List[str]:
+        new_titles = self.titles[self._emitted:]
+        self._emitted = len(self.titles)
+        return new_titles
+
+
+def iter_stream_titles(chunks: Iterable[bytes], parser: StreamingAllPagesParser) -> Iterator[List[str]]:
+    """
+    Yield batches of titles while chunks of the document arrive
+
+    Args:
+        chunks: Document bytes, e.g. ``response.iter_content()``
+        parser: Parser to feed; its ``next_url`` is set once the iterator is exhausted
+
+    Yields:
+        Non-empty lists of newly completed titles
+    """
+    for chunk in chunks:
+        titles = parser.feed_bytes(chunk)
+        if titles:
+            yield titles
+    titles = parser.finish()
+    if titles:
+        yield titles
+
+
+def parse_stream(content: bytes, base_url: str) -> ParsedPage:
+    """Streaming backend applied to a complete document"""
+    parser = StreamingAllPagesParser(base_url)
+    parser.feed_bytes(content)
+    parser.finish()
+    return parser.titles, parser.next_url
+
+
+PARSERS: Dict[str, Callable[[bytes, str], ParsedPage]] = {
+    'html.parser': parse_html_parser,
+    'strainer': parse_strainer,
+    'lxml': parse_lxml,
+    'selectolax': parse_selectolax,
+    'fast': parse_fast,
+    'stream': parse_stream,
+}
+
+
+def available_parsers() -> List[str]:
+    """Names of the backends whose optional dependency is installed"""
+    missing = {'lxml': lxml is None, 'selectolax': SelectolaxParser is None}
+    return [name for name in PARSERS if not missing.get(name, False)]
+
+
+def get_parser(name: str) -> Callable[[bytes, str], ParsedPage]:
+    """
+    Look up a parser backend by name
+
+    Args:
+        name: One of the keys of PARSERS
+
+    Returns:
+        Function mapping (content, base_url) to (titles, next page URL)
+    """
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser '{name}', expected one of {tuple(PARSERS)}")
+    if name not in available_parsers():
+        raise ValueError(f"Parser '{name}' requires the '{name}' package to be installed")
+    return PARSERS[name]
+
+
+def parse_page(name: str, content: bytes, base_url: str) -> ParsedPage:
+    """
+    Parse one page with the named backend
+
+    Module-level so it can be sent to a ProcessPoolExecutor: workers receive
+    the raw bytes and return the compact (titles, next URL) tuple.
+    """
+    return get_parser(name)(content, base_url)
@@ -0,0 +1,230 @@
+"""
+Staged Crawl Pipeline
+
+Runs fetching, parsing and storing on separate threads connected by bounded
+queues, so waiting for the rate limiter and the next request overlap with
+parsing and SQLite writes of earlier pages. Full queues block the upstream stage
+(backpressure), and per-stage counters and queue depths are logged periodically.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream on a stage queue
+_DONE = object()
+
+
+class StageStats:
+    """Counters for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, items: int = 1):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+    @property
+    def throughput(self) -> float:
+        """Items per busy second of this stage"""
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class CrawlPipeline:
+    """Fetcher -> parser -> writer threads over a WikipediaScraper"""
+
+    def __init__(self, scraper, parse_queue_size: int = 8, write_queue_size: int = 8,
+                 stats_interval: float = 10.0, parser_threads: int = 1):
+        """
+        Initialize the pipeline
+
+        Args:
+            scraper: WikipediaScraper providing fetching, parsing and storage
+            parse_queue_size: Fetched pages waiting to be parsed before the fetcher blocks
+            write_queue_size: Parsed pages waiting to be stored before the parser blocks
+            stats_interval: Seconds between progress log lines
+            parser_threads: Parser stage threads (more than one only helps when the
+                scraper parses in a process pool, which releases the GIL while waiting)
+        """
+        self.scraper = scraper
+        self.stats_interval = stats_interval
+        self.parser_threads = max(1, parser_threads)
+        self.parse_queue = queue.Queue(maxsize=parse_queue_size)
+        self.write_queue = queue.Queue(maxsize=write_queue_size)
+        # Cursors flow back from the parser, at most one per active range, so no bound is needed
+        self.cursor_queue = queue.Queue()
+        self.stats = {name: StageStats(name) for name in ('fetch', 'parse', 'write')}
+        self.pages_scraped = 0
+        self._error = None
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current per-stage counters, throughput and queue depths"""
+        depths = {'fetch': None, 'parse': self.parse_queue, 'write': self.write_queue}
+        result = {}
+        for name, stage in self.stats.items():
+            result[name] = {
+                'items': stage.items,
+                'busy_seconds': round(stage.busy_seconds, 3),
+                'per_second': round(stage.throughput, 2),
+            }
+            if depths[name] is not None:
+                result[name]['queue_depth'] = depths[name].qsize()
+                result[name]['queue_size'] = depths[name].maxsize
+        return result
+
+    def _log_stats(self):
+        parts = []
+        for name, stage in self.snapshot().items():
+            part = f"{name} {stage['items']} ({stage['per_second']}/s)"
+            if 'queue_depth' in stage:
+                part += f" queue {stage['queue_depth']}/{stage['queue_size']}"
+            parts.append(part)
+        logger.info("Pipeline: " + ", ".join(parts))
+
+    def _put(self, q: queue.Queue, item):
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns _DONE once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, stage: str, error: Exception):
+        logger.error(f"Pipeline {stage} stage failed: {error}")
+        self._error = error
+        self._stop.set()
+
+    def _fetcher(self, active_ranges: int):
+        try:
+            while active_ranges > 0:
+                item = self._get(self.cursor_queue)
+                if item is _DONE:
+                    break
+                range_id, url = item
+                if url is None:
+                    active_ranges -= 1
+                    continue
+
+                if not self.scraper._claim_page():
+                    logger.info("Reached maximum page limit")
+                    active_ranges -= 1
+                    continue
+
+                started = time.monotonic()
+                content = self.scraper._get_page(url)
+                self.stats['fetch'].record(time.monotonic() - started)
+                if content is None:
+                    self.scraper._record_failed_page(url, range_id)
+                    active_ranges -= 1
+                else:
+                    self._put(self.parse_queue, (range_id, url, content))
+        except Exception as e:
+            self._fail('fetch', e)
+        finally:
+            for _ in range(self.parser_threads):
+                self._put(self.parse_queue, _DONE)
+
+    def _parser(self):
+        try:
+            while True:
+                item = self._get(self.parse_queue)
+                if item is _DONE:
+                    break
+                range_id, url, content = item
+
+                started = time.monotonic()
+                articles, next_url = self.scraper._parse_page(content, url)
+                self.stats['parse'].record(time.monotonic() - started)
+
+                if not articles:
+                    logger.warning("No articles found on this page, stopping range")
+                    self.cursor_queue.put((range_id, None))
+                    continue
+
+                # Queue the write before handing the cursor back: with several parser threads,
+                # page N+1 can only be parsed after N's write is queued, so the writer never
+                # commits a cursor ahead of the titles of an earlier page of its range
+                self._put(self.write_queue, (range_id, articles, next_url))
+                self.cursor_queue.put((range_id, next_url))
+        except Exception as e:
+            self._fail('parse', e)
+        finally:
+            self._put(self.write_queue, _DONE)
+
+    def _writer(self):
+        try:
+            # Every parser thread ends its stream with one _DONE
+            parsers_running = self.parser_threads
+            while parsers_running:
+                item = self._get(self.write_queue)
+                if item is _DONE:
+                    parsers_running -= 1
+                    continue
+                range_id, articles, next_url = item
+
+                started = time.monotonic()
+                self.scraper._save_articles_to_db(articles)
+                self.scraper._update_range_cursor(range_id, next_url)
+                self.stats['write'].record(time.monotonic() - started)
+
+                self.pages_scraped += 1
+                logger.info(f"Page {self.pages_scraped} completed ({len(articles)} articles)")
+        except Exception as e:
+            self._fail('write', e)
+
+    def run(self, ranges: List[Tuple[Optional[int], str]]) -> int:
+        """
+        Crawl all ranges through the pipeline
+
+        Args:
+            ranges: (range_id, first page URL) of each key range
+
+        Returns:
+            Number of pages scraped
+        """
+        for range_id, url in ranges:
+            self.cursor_queue.put((range_id, url))
+
+        threads = [
+            threading.Thread(target=self._fetcher, args=(len(ranges),), name='pipeline-fetch', daemon=True),
+            *(threading.Thread(target=self._parser, name=f'pipeline-parse-{i}', daemon=True)
+              for i in range(self.parser_threads)),
+            threading.Thread(target=self._writer, name='pipeline-write', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            writer = threads[-1]
+            while writer.is_alive():
+                writer.join(self.stats_interval)
+                self._log_stats()
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return self.pages_scraped
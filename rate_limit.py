@@ -0,0 +1,110 @@
+"""
+Request Rate Limiting
+
+Token-bucket limiter shared by every worker thread and asyncio task of a
+crawl. Requests reserve a slot before they are sent, so response latency no
+longer adds to the interval between requests.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses by which MediaWiki asks clients to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second with bursts up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Sustained requests per second (0 or less disables limiting)
+            burst: Requests that may be sent back to back after an idle period
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, going into debt if none is available
+
+        Debt is what queues concurrent callers: each reservation is scheduled
+        one interval after the previous one.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Suspend the calling task until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status: int):
+        """Feedback hook for adaptive limiters; a fixed bucket ignores it"""
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket that backs off on 429/503 and recovers while responses are healthy"""
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = None,
+                 backoff_factor: float = 0.5, recovery_step: float = None):
+        """
+        Initialize the limiter
+
+        Args:
+            rate: Target requests per second, never exceeded
+            burst: Requests that may be sent back to back after an idle period
+            min_rate: Floor the rate is never cut below (default: rate / 16)
+            backoff_factor: Multiplier applied to the rate on each throttling response
+            recovery_step: Rate added back per healthy response (default: rate / 20)
+        """
+        super().__init__(rate, burst)
+        self.target_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step if recovery_step is not None else rate / 20
+
+    def on_response(self, status: int):
+        """
+        Adjust the rate from a response status (multiplicative decrease, additive increase)
+
+        Args:
+            status: HTTP status code of the response
+        """
+        if self.target_rate <= 0:
+            return
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                new_rate = max(self.min_rate, self.rate * self.backoff_factor)
+                if new_rate < self.rate:
+                    logger.warning(f"Server throttling (HTTP {status}), slowing to {new_rate:.2f} req/s")
+                self.rate = new_rate
+            elif status < 400 and self.rate < self.target_rate:
+                self.rate = min(self.target_rate, self.rate + self.recovery_step)
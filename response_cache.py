@@ -0,0 +1,178 @@
+"""
+HTTP Response Cache
+
+Persistent on-disk cache of fetched pages, keyed by the SHA-256 of the request
+URL. Entries are compressed with zstd when the ``zstandard`` package is
+installed and gzip otherwise, and the least recently used entries are evicted
+once the cache outgrows its size limit. Each entry also stores its URL, so
+the database can be rebuilt from the cache alone.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+CODECS = ('zstd', 'gzip')
+
+
+class ResponseCache:
+    """Content-addressed, compressed, size-bounded store of response bodies"""
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 ** 3, codec: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total compressed size above which old entries are evicted
+            codec: 'zstd' or 'gzip' for new entries (default: zstd if available)
+        """
+        if codec is None:
+            codec = 'zstd' if zstandard is not None else 'gzip'
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {CODECS}")
+        if codec == 'zstd' and zstandard is None:
+            raise ValueError("The zstd codec requires the 'zstandard' package")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _entry_paths(self) -> Iterator[str]:
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(CODECS):
+                        yield entry.path
+
+    def _path(self, url: str, codec: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.{codec}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(path: str, data: bytes) -> bytes:
+        if path.endswith('.zstd'):
+            if zstandard is None:
+                raise ValueError(f"Cannot read {path} without the 'zstandard' package")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def _read(self, path: str) -> Tuple[str, bytes]:
+        with open(path, 'rb') as f:
+            url, _, content = self._decompress(path, f.read()).partition(b'\n')
+        return url.decode('utf-8'), content
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Look up a cached response body
+
+        Args:
+            url: Request URL
+
+        Returns:
+            Cached body or None on a miss
+        """
+        for codec in CODECS:
+            path = self._path(url, codec)
+            try:
+                cached_url, content = self._read(path)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+                continue
+            if cached_url != url:
+                continue
+            # Touch the entry so eviction removes the least recently used ones first
+            os.utime(path)
+            self.hits += 1
+            return content
+
+        self.misses += 1
+        return None
+
+    def put(self, url: str, content: bytes):
+        """
+        Store a response body, evicting old entries if the cache is full
+
+        Args:
+            url: Request URL
+            content: Response body
+        """
+        path = self._path(url, self.codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = self._compress(url.encode('utf-8') + b'\n' + content)
+
+        # Write atomically so a crash never leaves a truncated entry behind
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is at 90% of its limit"""
+        entries = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cache entries, cache size now {self._size / 1024 ** 2:.1f} MiB")
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield (url, body) for every cached response"""
+        for path in self._entry_paths():
+            try:
+                yield self._read(path)
+            except (OSError, ValueError, EOFError) as e:
+                logger.warning(f"Skipping unreadable cache entry {path}: {e}")
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entry_paths())
+
+    @property
+    def size_bytes(self) -> int:
+        """Total compressed size of all entries"""
+        return self._size
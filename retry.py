@@ -0,0 +1,93 @@
+"""
+Retry Policy
+
+Exponential backoff with full jitter for transient fetch failures. Server
+hints win over the computed backoff: ``Retry-After`` headers and MediaWiki
+``maxlag`` responses (replication lag too high) set the minimum wait.
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+# HTTP statuses worth retrying; other 4xx errors will not succeed on a retry
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_reason(status: int, headers: Mapping[str, str]) -> Optional[str]:
+    """
+    Decide whether a response should be retried
+
+    MediaWiki signals maxlag with a ``MediaWiki-API-Error: maxlag`` header on
+    API responses (often with HTTP 200) and with HTTP 503 plus
+    ``X-Database-Lag`` on index.php.
+
+    Args:
+        status: HTTP status code
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        Short description of why to retry, or None if the response is final
+    """
+    if headers.get('MediaWiki-API-Error') == 'maxlag' or 'X-Database-Lag' in headers:
+        return f"maxlag (database lag {headers.get('X-Database-Lag', '?')}s)"
+    if status in RETRYABLE_STATUSES:
+        return f"HTTP {status}"
+    return None
+
+
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed request"""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Initialize the policy
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            base_delay: Backoff ceiling of the first retry in seconds
+            max_delay: Upper bound of any computed backoff in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before the next attempt
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+            retry_after: Server-requested wait, if any
+
+        Returns:
+            Full-jitter exponential backoff, but never less than retry_after
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
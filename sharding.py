@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Sharded Article Storage
+
+Optional layout that spreads the articles table over several SQLite files,
+so writers of different shards never wait on the same database lock. The
+main database keeps the crawl state (crawl_ranges, failed_pages) and the
+shard configuration; titles live in ``<db>.shardNN.db`` files, routed by:
+
+- ``first-char``: contiguous title ranges split at keyspace boundaries, so
+  every shard holds one slice of the sorted title list (and the crawl
+  ranges of an equally partitioned crawl each write a single shard)
+- ``hash``: CRC32 of the title, which spreads any title distribution evenly
+
+ShardedArticleStore is an ArticleStore whose title operations go to one
+ArticleStore per shard; ShardedWriter gives every shard its own writer
+thread. A range checkpoint is only committed after every shard writer has
+drained and committed the titles queued before it, so a checkpoint never
+gets ahead of the titles of its pages.
+
+ShardReader is a read-only connection with every shard ATTACHed and an
+``all_articles`` view over their union. SQLite attaches at most 10
+databases by default, which bounds the number of shards (MAX_SHARDS).
+"""
+
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from bisect import bisect_right
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from keyspace import default_boundaries
+from storage import ArticleStore, BackgroundWriter
+from title_search import prefix_titles, search_titles
+
+
+logger = logging.getLogger(__name__)
+
+SHARD_SCHEMES = ('first-char', 'hash')
+# SQLITE_MAX_ATTACHED of a default build
+MAX_SHARDS = 10
+
+
+def shard_paths(db_name: str, shards: int) -> List[str]:
+    """Files of the shards of a database"""
+    base, ext = os.path.splitext(db_name)
+    return [f"{base}.shard{i:02d}{ext or '.db'}" for i in range(shards)]
+
+
+class ShardRouter:
+    """Maps titles to shard numbers"""
+
+    def __init__(self, shards: int, scheme: str = 'first-char', boundaries: Optional[List[str]] = None):
+        """
+        Args:
+            shards: Number of shards (2 to MAX_SHARDS)
+            scheme: 'first-char' (contiguous title ranges) or 'hash' (CRC32 of the title)
+            boundaries: First titles of shards 1..n-1 for 'first-char'
+                (default: estimated from first-character weights)
+        """
+        if scheme not in SHARD_SCHEMES:
+            raise ValueError(f"Unknown shard scheme '{scheme}', expected one of {SHARD_SCHEMES}")
+        if not 2 <= shards <= MAX_SHARDS:
+            raise ValueError(f"Shard count must be between 2 and {MAX_SHARDS}, got {shards}")
+        self.shards = shards
+        self.scheme = scheme
+        self.boundaries = []
+        if scheme == 'first-char':
+            self.boundaries = list(boundaries) if boundaries is not None else default_boundaries(shards)
+            if len(self.boundaries) != shards - 1:
+                raise ValueError(f"{shards} shards need {shards - 1} boundaries, got {len(self.boundaries)}")
+
+    @property
+    def ordered(self) -> bool:
+        """Whether shard i only holds titles sorting before those of shard i + 1"""
+        return self.scheme == 'first-char'
+
+    def shard_for(self, title: str) -> int:
+        """Shard number of a title"""
+        if self.ordered:
+            # str order is code point order, which matches SQLite's BINARY collation of UTF-8
+            return bisect_right(self.boundaries, title)
+        # hash() is salted per process; CRC32 routes a title to the same shard in every run
+        return zlib.crc32(title.encode('utf-8')) % self.shards
+
+    def split(self, titles: Iterable[str]) -> Dict[int, List[str]]:
+        """Group titles by shard number"""
+        groups = {}
+        for title in titles:
+            groups.setdefault(self.shard_for(title), []).append(title)
+        return groups
+
+
+def load_shard_config(conn: sqlite3.Connection) -> Optional[ShardRouter]:
+    """Router saved in a main database (None if it is not sharded)"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'shard_config'").fetchone() is None:
+        return None
+    config = dict(conn.execute("SELECT name, value FROM shard_config"))
+    return ShardRouter(int(config['shards']), config['scheme'], json.loads(config['boundaries']))
+
+
+def open_shard_router(db_name: str, shards: int = 0, scheme: str = 'first-char') -> Optional[ShardRouter]:
+    """
+    Router of a database, saving a new configuration when sharding is requested
+
+    A database keeps the configuration it was created with; only an empty
+    one can become sharded (move existing titles with --export-archive and
+    --import-archive).
+
+    Args:
+        db_name: Main SQLite database file (its tables must already exist)
+        shards: Requested number of shards (0 or 1 for whatever the database uses)
+        scheme: Shard scheme for a new configuration
+
+    Returns:
+        The router, or None for an unsharded database
+    """
+    conn = sqlite3.connect(db_name)
+    try:
+        router = load_shard_config(conn)
+        if router is not None:
+            if shards > 1 and (shards, scheme) != (router.shards, router.scheme):
+                raise ValueError(f"'{db_name}' is split into {router.shards} '{router.scheme}' shards; "
+                                 f"it cannot be opened with {shards} '{scheme}' shards")
+            return router
+        if shards <= 1:
+            return None
+        if conn.execute("SELECT 1 FROM articles LIMIT 1").fetchone() is not None:
+            raise ValueError(f"'{db_name}' already holds articles; export them with --export-archive "
+                             f"and import the archive into a new sharded database")
+
+        router = ShardRouter(shards, scheme)
+        with conn:
+            conn.execute("CREATE TABLE shard_config (name TEXT PRIMARY KEY NOT NULL, value TEXT NOT NULL)")
+            conn.executemany("INSERT INTO shard_config (name, value) VALUES (?, ?)", [
+                ('shards', str(router.shards)),
+                ('scheme', router.scheme),
+                ('boundaries', json.dumps(router.boundaries)),
+            ])
+        logger.info(f"Splitting articles of '{db_name}' into {shards} '{scheme}' shards")
+        return router
+    finally:
+        conn.close()
+
+
+class ShardedArticleStore(ArticleStore):
+    """ArticleStore whose titles are spread over one ArticleStore per shard"""
+
+    def __init__(self, db_name: str, router: ShardRouter, profile: str = 'fast-bulk', commit_rows: int = 10000,
+                 commit_interval: float = 2.0, dedup_filter_bytes: int = 0):
+        """
+        Open the main database and every shard
+
+        Args:
+            db_name: Main SQLite database file (crawl state); shard files come from shard_paths()
+            router: Shard configuration of the database
+            profile: Key of STORAGE_PROFILES, applied to every file
+            commit_rows: Pending titles that trigger a commit of a shard
+            commit_interval: Seconds after the first pending write that trigger a commit
+            dedup_filter_bytes: Memory budget of the dedup filters, split evenly between shards
+        """
+        super().__init__(db_name, profile, commit_rows, commit_interval)
+        self.router = router
+        self.dedup_filter_bytes = dedup_filter_bytes
+        self.shards = [
+            ArticleStore(path, profile, commit_rows, commit_interval, dedup_filter_bytes // router.shards)
+            for path in shard_paths(db_name, router.shards)
+        ]
+        self.layout = self.shards[0].layout
+        # Per-shard writer threads (see ShardedWriter) that must drain before a checkpoint commits
+        self.writers = None
+
+    def flush(self):
+        """Commit every shard (after its writer drained), then the crawl state"""
+        with self.lock:
+            for shard, writer in zip(self.shards, self.writers or [None] * len(self.shards)):
+                if writer is not None:
+                    writer.flush()
+                else:
+                    shard.flush()
+            self.skipped_titles = sum(shard.skipped_titles for shard in self.shards)
+            super().flush()
+
+    def save_titles(self, titles: Iterable[str]) -> int:
+        """
+        Insert titles into their shards; only the locks of those shards are taken
+
+        Returns:
+            Number of new rows, or of staged rows during a bulk load
+        """
+        return sum(self.shards[shard].save_titles(group) for shard, group in self.router.split(titles).items())
+
+    def begin_bulk_load(self):
+        """Start a bulk load in every shard (see ArticleStore.begin_bulk_load())"""
+        with self.lock:
+            for shard in self.shards:
+                shard.begin_bulk_load()
+            self.bulk_path = self.shards[0].bulk_path
+
+    def finish_bulk_load(self) -> int:
+        """Merge the staged titles of every shard; returns the number of new articles"""
+        with self.lock:
+            inserted = sum(shard.finish_bulk_load() for shard in self.shards)
+            self.bulk_path = None
+            return inserted
+
+    def migrate_layout(self, layout: str) -> int:
+        """Rebuild the articles table of every shard in another layout"""
+        with self.lock:
+            rows = sum(shard.migrate_layout(layout) for shard in self.shards)
+            self.layout = layout
+            return rows
+
+    def enable_search(self):
+        """Build and maintain the title search index of every shard"""
+        for shard in self.shards:
+            shard.enable_search()
+
+    def count(self, exact: bool = False) -> int:
+        """Number of stored articles over all shards (see ArticleStore.count())"""
+        return sum(shard.count(exact) for shard in self.shards)
+
+    def last_title(self) -> Optional[str]:
+        """Alphabetically last stored title"""
+        titles = [shard.last_title() for shard in self.shards]
+        return max((title for title in titles if title is not None), default=None)
+
+    def title_at(self, offset: int) -> Optional[str]:
+        """Title at a position of the sorted title list over all shards"""
+        if self.router.ordered:
+            for shard in self.shards:
+                count = shard.count()
+                if offset < count:
+                    return shard.title_at(offset)
+                offset -= count
+            return None
+        with ShardReader(self.db_name) as reader:
+            row = reader.conn.execute("SELECT title FROM all_articles ORDER BY title LIMIT 1 OFFSET ?",
+                                      (offset,)).fetchone()
+            return row[0] if row else None
+
+    def close(self):
+        """Commit outstanding work and close the shards and the main database"""
+        super().close()
+        for shard in self.shards:
+            shard.close()
+
+
+class ShardedWriter:
+    """BackgroundWriter counterpart with one writer thread per shard plus one for checkpoints"""
+
+    def __init__(self, store: ShardedArticleStore, queue_size: int = 64):
+        """
+        Start the writer threads
+
+        Args:
+            store: Sharded store the writes are applied to
+            queue_size: Pages waiting for each writer before callers block
+        """
+        self.store = store
+        self.shard_writers = [
+            BackgroundWriter(shard, queue_size, name=f'sqlite-writer-{i}') for i, shard in enumerate(store.shards)
+        ]
+        self.checkpoint_writer = BackgroundWriter(store, queue_size, name='sqlite-writer-checkpoints')
+        store.writers = self.shard_writers
+
+    @property
+    def saved(self) -> int:
+        """New titles written so far"""
+        return sum(writer.saved for writer in self.shard_writers)
+
+    def save_titles(self, titles: List[str]):
+        """Queue titles with the writers of their shards, blocking while a queue is full"""
+        for shard, group in self.store.router.split(titles).items():
+            self.shard_writers[shard].save_titles(group)
+
+    def update_range_cursor(self, range_id: int, next_url: Optional[str]):
+        """Queue a range checkpoint; it commits after the titles queued before it"""
+        self.checkpoint_writer.update_range_cursor(range_id, next_url)
+
+    def flush(self):
+        """Wait until every queued write is applied and committed"""
+        for writer in self.shard_writers:
+            writer.flush()
+        self.checkpoint_writer.flush()
+
+    def close(self):
+        """Apply outstanding writes and stop the threads"""
+        # Titles first: a checkpoint applied afterwards then finds the shard queues empty
+        for writer in self.shard_writers:
+            writer.close()
+        self.checkpoint_writer.close()
+        self.store.writers = None
+
+
+class ShardReader:
+    """Read-only connection to a sharded database with every shard attached"""
+
+    def __init__(self, db_name: str):
+        """
+        Attach the shards and create the temporary all_articles view
+
+        Args:
+            db_name: Main SQLite database file
+        """
+        self.conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True, check_same_thread=False)
+        self.router = load_shard_config(self.conn)
+        if self.router is None:
+            self.conn.close()
+            raise ValueError(f"'{db_name}' is not a sharded database")
+        self.schemas = [f"shard{i}" for i in range(self.router.shards)]
+        for schema, path in zip(self.schemas, shard_paths(db_name, self.router.shards)):
+            self.conn.execute("ATTACH DATABASE ? AS ?", (f"file:{path}?mode=ro", schema))
+        union = " UNION ALL ".join(f"SELECT title FROM {schema}.articles" for schema in self.schemas)
+        self.conn.execute(f"CREATE TEMP VIEW all_articles AS {union}")
+        # Queries may come from any thread (like TitleSearch), but a cursor must not be shared
+        self.lock = threading.Lock()
+
+    def count(self) -> int:
+        """Number of committed articles over all shards"""
+        with self.lock:
+            return sum(self.conn.execute(f"SELECT value FROM {schema}.article_stats WHERE name = 'articles'")
+                       .fetchone()[0] for schema in self.schemas)
+
+    def shard_counts(self) -> List[int]:
+        """Number of committed articles per shard"""
+        with self.lock:
+            return [self.conn.execute(f"SELECT value FROM {schema}.article_stats WHERE name = 'articles'")
+                    .fetchone()[0] for schema in self.schemas]
+
+    def __contains__(self, title: str) -> bool:
+        schema = self.schemas[self.router.shard_for(title)]
+        with self.lock:
+            return self.conn.execute(f"SELECT 1 FROM {schema}.articles WHERE title = ?", (title,)).fetchone() is not None
+
+    def titles(self) -> Iterator[str]:
+        """
+        Every committed title in order
+
+        The per-shard scans are merged (or simply chained for 'first-char'
+        shards), so no sort of the whole union is needed. Use a dedicated
+        reader while iterating from several threads.
+        """
+        scans = [(title for title, in self.conn.execute(f"SELECT title FROM {schema}.articles ORDER BY title"))
+                 for schema in self.schemas]
+        if self.router.ordered:
+            for scan in scans:
+                yield from scan
+        else:
+            yield from heapq.merge(*scans)
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """Titles starting with prefix, in order (see title_search.prefix_titles())"""
+        with self.lock:
+            found = [prefix_titles(self.conn, prefix, limit, schema) for schema in self.schemas]
+        return list(islice(heapq.merge(*found), limit))
+
+    def search_titles(self, query: str, limit: int = 20, ranked: bool = False) -> List[str]:
+        """
+        Titles containing query, ignoring case; every shard needs a search index
+
+        Shards are searched in order until `limit` titles are found; with
+        ranked, titles are ordered by relevance within each shard.
+        """
+        titles = []
+        with self.lock:
+            for schema in self.schemas:
+                titles += search_titles(self.conn, query, limit - len(titles), ranked, schema)
+                if len(titles) >= limit:
+                    break
+        return titles
+
+    def query(self, sql: str, params: Tuple = ()) -> List[tuple]:
+        """Run a read-only statement, e.g. over the all_articles view"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """Close the connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    """Print the shard layout of a database"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect a sharded articles database')
+    parser.add_argument('--db', type=str, default='wikipedia_articles.db', help='Main SQLite database file')
+    parser.add_argument('--lookup', type=str, help='Check whether a title exists')
+    args = parser.parse_args()
+
+    with ShardReader(args.db) as reader:
+        if args.lookup is not None:
+            print(f"'{args.lookup}': {'found' if args.lookup in reader else 'not found'} "
+                  f"(shard {reader.router.shard_for(args.lookup)})")
+            return
+        print(f"{reader.router.shards} '{reader.router.scheme}' shards, {reader.count()} titles")
+        starts = [''] + reader.router.boundaries
+        for i, (path, count) in enumerate(zip(shard_paths(args.db, reader.router.shards), reader.shard_counts())):
+            start = f" from '{starts[i]}'" if reader.router.ordered and i else ''
+            print(f"  {path}: {count} titles{start}")
+
+
+if __name__ == "__main__":
+    main()
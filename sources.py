@@ -0,0 +1,184 @@
+"""
+AllPages Source Backends
+
+A source knows how to address a slice of the title listing and how to turn a
+raw response into articles plus the URL of the next slice. The scraper picks
+one with its ``backend`` argument.
+"""
+
+import json
+import logging
+from urllib.parse import quote_plus, urlencode, urlparse, parse_qsl, urlunparse
+from typing import List, Optional, Tuple
+
+from parsers import get_parser, parse_page
+
+
+logger = logging.getLogger(__name__)
+
+
+class HtmlAllPagesSource:
+    """Scrapes the rendered Special:AllPages HTML (~345 titles per request)"""
+
+    name = 'html'
+
+    def __init__(self, scraper):
+        """
+        Args:
+            scraper: WikipediaScraper providing base_url and the parser backend name
+        """
+        self.scraper = scraper
+        self.parse_html = get_parser(scraper.parser)
+
+    def start_url(self, from_title: str, to_title: Optional[str] = None) -> str:
+        """Build the Special:AllPages URL listing titles from from_title (up to to_title)"""
+        url = f"{self.scraper.base_url}/w/index.php?title=Special:AllPages&from={quote_plus(from_title)}"
+        if to_title is not None:
+            url += f"&to={quote_plus(to_title)}"
+        return url
+
+    def start_title(self, url: str) -> str:
+        """First title a Special:AllPages URL lists from"""
+        return dict(parse_qsl(urlparse(url).query)).get('from', '!')
+
+    def bound_next_url(self, url: str, next_url: Optional[str]) -> Optional[str]:
+        """
+        Carry the ``to`` bound of a request into the URL of its next page
+
+        Special:AllPages builds its next link from ``from`` alone, so without
+        this every range but the last would run on to the end of the title space.
+
+        Args:
+            url: URL the page was fetched from
+            next_url: Next page link found on the page
+
+        Returns:
+            Next page URL bounded like url, or None once it starts past the bound
+        """
+        to_title = dict(parse_qsl(urlparse(url).query)).get('to')
+        if next_url is None or to_title is None:
+            return next_url
+        parsed = urlparse(next_url)
+        params = dict(parse_qsl(parsed.query))
+        if params.get('from', '').replace('_', ' ') > to_title.replace('_', ' '):
+            return None
+        params['to'] = to_title
+        return urlunparse(parsed._replace(query=urlencode(params)))
+
+    def parse(self, content: bytes, url: str) -> Tuple[List[dict], Optional[str]]:
+        """
+        Parse one Special:AllPages page
+
+        Args:
+            content: Response body
+            url: URL the body was fetched from
+
+        Returns:
+            Tuple of (articles on the page, URL of the next page or None)
+        """
+        pool = self.scraper.parse_pool
+        if pool is not None:
+            # Parse in a worker process; only the bytes and the title list cross over
+            titles, next_url = pool.submit(parse_page, self.scraper.parser, content, self.scraper.base_url).result()
+        else:
+            titles, next_url = self.parse_html(content, self.scraper.base_url)
+        if not titles:
+            logger.warning("Could not find any articles in the article list container")
+        logger.info(f"Extracted {len(titles)} articles from page")
+        return [{'title': title} for title in titles], self.bound_next_url(url, next_url)
+
+
+class ApiAllPagesSource:
+    """Uses the MediaWiki API (list=allpages), 500+ titles per request as JSON"""
+
+    name = 'api'
+
+    def __init__(self, scraper):
+        """
+        Args:
+            scraper: WikipediaScraper providing base_url
+        """
+        self.scraper = scraper
+
+    def start_url(self, from_title: str, to_title: Optional[str] = None) -> str:
+        """Build the api.php query listing titles from from_title (up to to_title)"""
+        params = {
+            'action': 'query',
+            'list': 'allpages',
+            'apnamespace': 0,
+            'aplimit': 'max',
+            'format': 'json',
+            'formatversion': 2,
+            # Ask to be refused while replication lag is high; the retry layer waits it out
+            'maxlag': 5,
+            'apfrom': from_title,
+        }
+        if to_title is not None:
+            params['apto'] = to_title
+        return f"{self.scraper.base_url}/w/api.php?{urlencode(params)}"
+
+    def start_title(self, url: str) -> str:
+        """First title an allpages query lists from (continuation keys use underscores)"""
+        params = dict(parse_qsl(urlparse(url).query))
+        return params.get('apcontinue', params.get('apfrom', '!')).replace('_', ' ')
+
+    def parse(self, content: bytes, url: str) -> Tuple[List[dict], Optional[str]]:
+        """
+        Decode one list=allpages response
+
+        Args:
+            content: Response body
+            url: URL the body was fetched from (its parameters are carried into the next request)
+
+        Returns:
+            Tuple of (articles with title and pageid, URL of the next batch or None)
+        """
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            logger.error(f"Invalid JSON from API: {e}")
+            return [], None
+
+        if 'error' in data:
+            logger.error(f"API error: {data['error'].get('code')}: {data['error'].get('info')}")
+            return [], None
+
+        pages = data.get('query', {}).get('allpages', [])
+        articles = [{'title': page['title'], 'pageid': page.get('pageid')} for page in pages]
+        logger.info(f"Extracted {len(articles)} articles from API response")
+
+        continuation = data.get('continue')
+        if not continuation:
+            return articles, None
+
+        parsed = urlparse(url)
+        params = dict(parse_qsl(parsed.query))
+        params.update(continuation)
+        return articles, urlunparse(parsed._replace(query=urlencode(params)))
+
+
+SOURCES = {
+    HtmlAllPagesSource.name: HtmlAllPagesSource,
+    ApiAllPagesSource.name: ApiAllPagesSource,
+}
+
+
+def source_name_for_url(url: str) -> str:
+    """Name of the source backend that produced a request URL"""
+    return ApiAllPagesSource.name if urlparse(url).path.endswith('/api.php') else HtmlAllPagesSource.name
+
+
+def create_source(name: str, scraper):
+    """
+    Instantiate a source backend by name
+
+    Args:
+        name: One of the keys of SOURCES
+        scraper: WikipediaScraper the source serves
+
+    Returns:
+        Source instance
+    """
+    if name not in SOURCES:
+        raise ValueError(f"Unknown backend '{name}', expected one of {tuple(SOURCES)}")
+    return SOURCES[name](scraper)
@@ -0,0 +1,546 @@
+"""
+Article Storage
+
+ArticleStore owns the single SQLite connection a scraper writes through for
+its whole lifetime, configured by a storage profile:
+
+- ``durable``: WAL with ``synchronous=FULL``; every commit survives power loss
+- ``fast-bulk``: WAL with ``synchronous=NORMAL``, a large page cache and
+  in-memory temp storage; the database never corrupts, but the last commits
+  may be lost on power loss (a crawl simply re-fetches those pages)
+
+Saved titles and range checkpoints are group committed: they accumulate in
+one open transaction that is committed once ``commit_rows`` titles are
+pending or ``commit_interval`` seconds have passed since its first write.
+A checkpoint therefore never becomes durable without the titles of the
+pages before it.
+
+BackgroundWriter moves those writes onto a dedicated thread fed by a bounded
+queue, so crawl loops hand off a page and continue fetching while SQLite
+works; a full queue blocks them (backpressure) and a failed write is raised
+in the crawl loop on its next call.
+
+For from-scratch builds a bulk load skips the UNIQUE title index entirely
+while loading: titles are appended to an unindexed staging table in a
+separate, unjournaled file, and finish_bulk_load() moves them into articles
+in one sorted pass, so the B-trees of the articles table are only ever
+appended to.
+
+The articles table comes in two layouts (ARTICLE_LAYOUTS):
+
+- ``rowid``: a synthetic integer id plus a UNIQUE title index, which stores
+  every title twice
+- ``title``: a WITHOUT ROWID table keyed on the title itself; about half the
+  size, and lookups and ordered scans touch a single B-tree
+
+migrate_layout() rebuilds an existing table in the other layout (and restores
+the triggers of the optional title search index, see title_search.py).
+
+With a dedup filter (dedup_filter.py) save_titles() drops titles that are
+already stored before they reach an INSERT: filter hits are confirmed with
+one read-only IN query, so a recrawl of known pages writes nothing.
+
+The number of articles is kept in the article_stats table, updated from the
+insert rowcounts in the same transaction as the inserts, so count() is a
+single-row lookup instead of a scan of the whole title index.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from dedup_filter import TitleFilter
+from funcs import create_table_sql
+from title_search import create_search_index, has_search_index
+
+
+logger = logging.getLogger(__name__)
+
+# Table definitions in the schema format of funcs.create_sqlite_db()
+ARTICLE_LAYOUTS: Dict[str, Dict] = {
+    'rowid': {
+        'columns': {
+            'id': {'type': 'INTEGER', 'primary_key': True, 'not_null': True},
+            'title': {'type': 'TEXT', 'not_null': True, 'unique': True},
+        },
+    },
+    'title': {
+        'columns': {
+            'title': {'type': 'TEXT', 'primary_key': True, 'not_null': True},
+        },
+        'without_rowid': True,
+    },
+}
+
+# Ends the background writer's queue
+_DONE = object()
+
+STORAGE_PROFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -65536,           # 64 MiB
+        'temp_store': 'MEMORY',
+    },
+    'fast-bulk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -262144,          # 256 MiB
+        'temp_store': 'MEMORY',
+        'mmap_size': 268435456,         # 256 MiB
+        'wal_autocheckpoint': 10000,    # pages
+    },
+}
+
+
+def articles_layout(conn: sqlite3.Connection) -> Optional[str]:
+    """Layout of the existing articles table (None if there is none)"""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles'").fetchone()
+    if row is None:
+        return None
+    return 'title' if 'WITHOUT ROWID' in row[0].upper() else 'rowid'
+
+
+class ArticleStore:
+    """Long-lived, thread-safe connection to the articles database"""
+
+    def __init__(self, db_name: str, profile: str = 'fast-bulk', commit_rows: int = 10000,
+                 commit_interval: float = 2.0, dedup_filter_bytes: int = 0):
+        """
+        Open the database and apply the storage profile
+
+        Args:
+            db_name: SQLite database file (its tables must already exist)
+            profile: Key of STORAGE_PROFILES
+            commit_rows: Pending titles that trigger a commit (1 commits every write)
+            commit_interval: Seconds after the first pending write that trigger a commit (positive)
+            dedup_filter_bytes: Memory budget of the in-memory filter of stored titles (0 disables it)
+        """
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile '{profile}', expected one of {tuple(STORAGE_PROFILES)}")
+        if commit_interval <= 0:
+            # The background writer also wakes up at this interval while idle
+            raise ValueError("commit_interval must be positive; use commit_rows=1 to commit every write")
+
+        self.db_name = db_name
+        self.profile = profile
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval
+        self.commits = 0
+        self._pending_rows = 0
+        self._pending_since = None
+        self.bulk_path = None
+        self.dedup_filter_bytes = dedup_filter_bytes
+        self.filter = None
+        self.skipped_titles = 0
+        # Shared by crawl threads and asyncio worker threads; every use holds the lock
+        self.conn = sqlite3.connect(db_name, check_same_thread=False, timeout=30)
+        self.lock = threading.RLock()
+
+        for pragma, value in STORAGE_PROFILES[profile].items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        self.layout = articles_layout(self.conn)
+        self._init_stats()
+        logger.info(f"Opened '{db_name}' with storage profile '{profile}' ({self.layout} layout)")
+        if dedup_filter_bytes > 0:
+            self._load_filter()
+
+    def _init_stats(self):
+        """Seed the article counter of a database created before article_stats existed"""
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM article_stats WHERE name = 'articles'").fetchone() is None:
+                self.conn.execute("INSERT INTO article_stats (name, value) SELECT 'articles', COUNT(*) FROM articles")
+                self.conn.commit()
+
+    def _add_articles(self, rows: int):
+        if rows:
+            self.conn.execute("UPDATE article_stats SET value = value + ? WHERE name = 'articles'", (rows,))
+
+    def _load_filter(self):
+        """Build the dedup filter from every stored title"""
+        with self.lock:
+            started = time.monotonic()
+            self.filter = TitleFilter(self.dedup_filter_bytes)
+            self.filter.load(title for title, in self.conn.execute("SELECT title FROM articles"))
+            logger.info(f"Loaded {len(self.filter)} titles into the dedup filter "
+                        f"({self.filter.size_bytes / 1024 ** 2:.1f} MiB) in {time.monotonic() - started:.1f}s")
+
+    def _drop_known(self, titles: List[str]) -> List[str]:
+        """Titles that are not stored yet; filter hits are confirmed with a read-only query"""
+        maybe = []
+        unseen = []
+        for title in titles:
+            (maybe if title in self.filter else unseen).append(title)
+        if not maybe:
+            return unseen
+
+        stored = set()
+        for i in range(0, len(maybe), 500):
+            chunk = maybe[i:i + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            stored.update(title for title, in self.conn.execute(
+                f"SELECT title FROM articles WHERE title IN ({placeholders})", chunk
+            ))
+        self.skipped_titles += len(titles) - len(unseen) - sum(1 for title in maybe if title not in stored)
+        # Hash collisions with stored titles are rare, but such titles are new all the same
+        return unseen + [title for title in maybe if title not in stored]
+
+    def _written(self, rows: int):
+        """Account for a write to the open transaction and commit once a threshold is reached"""
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        self._pending_rows += rows
+        if (self._pending_rows >= self.commit_rows
+                or time.monotonic() - self._pending_since >= self.commit_interval):
+            self.flush()
+
+    def flush(self):
+        """Commit the open transaction"""
+        with self.lock:
+            self.conn.commit()
+            if self._pending_since is not None:
+                self.commits += 1
+            self._pending_rows = 0
+            self._pending_since = None
+
+    def save_titles(self, titles: Iterable[str]) -> int:
+        """
+        Insert titles, ignoring ones already stored, into the open transaction
+
+        During a bulk load titles are only staged (duplicates included).
+
+        Returns:
+            Number of new rows, or of staged rows during a bulk load
+        """
+        with self.lock:
+            if self.bulk_path is not None:
+                sql = "INSERT INTO bulk.staging (title) VALUES (?)"
+            else:
+                sql = "INSERT OR IGNORE INTO articles (title) VALUES (?)"
+                if self.filter is not None:
+                    titles = self._drop_known(list(titles))
+                    if not titles:
+                        return 0
+            if not self.conn.in_transaction:
+                # Open the group commit transaction first, so releasing the savepoint does not commit
+                self.conn.execute("BEGIN")
+            # A failed batch is rolled back whole, keeping the counter and later checkpoints consistent
+            self.conn.execute("SAVEPOINT save_titles")
+            try:
+                cursor = self.conn.executemany(sql, ((title,) for title in titles))
+                if self.bulk_path is None:
+                    self._add_articles(cursor.rowcount)
+            except sqlite3.Error:
+                self.conn.execute("ROLLBACK TO save_titles")
+                self.conn.execute("RELEASE save_titles")
+                raise
+            self.conn.execute("RELEASE save_titles")
+            if self.bulk_path is None and self.filter is not None:
+                for title in titles:
+                    self.filter.add(title)
+            self._written(cursor.rowcount)
+            return cursor.rowcount
+
+    def begin_bulk_load(self):
+        """
+        Route save_titles() into a staging table until finish_bulk_load()
+
+        The staging table lives in '<db_name>-bulk', attached without a journal
+        or fsyncs; an interrupted load simply starts over. Titles staged so far
+        are not visible to count() and the other queries.
+        """
+        with self.lock:
+            if self.bulk_path is not None:
+                raise ValueError("A bulk load is already in progress")
+            self.flush()
+            path = f"{self.db_name}-bulk"
+            if os.path.exists(path):
+                os.remove(path)
+            self.conn.execute("ATTACH DATABASE ? AS bulk", (path,))
+            self.conn.execute("PRAGMA bulk.journal_mode = OFF")
+            self.conn.execute("PRAGMA bulk.synchronous = OFF")
+            self.conn.execute("CREATE TABLE bulk.staging (title TEXT)")
+            self.bulk_path = path
+            logger.info(f"Bulk load started, staging titles in '{path}'")
+
+    def finish_bulk_load(self) -> int:
+        """
+        Deduplicate the staged titles into articles in sorted order and drop the staging file
+
+        Returns:
+            Number of new articles
+        """
+        with self.lock:
+            if self.bulk_path is None:
+                raise ValueError("No bulk load in progress")
+            self.flush()
+            # The sort can exceed memory for tens of millions of titles, so let it spill to disk
+            self.conn.execute("PRAGMA temp_store = DEFAULT")
+            try:
+                started = time.monotonic()
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO articles (title) SELECT title FROM bulk.staging ORDER BY title"
+                )
+                self._add_articles(cursor.rowcount)
+                self.flush()
+                logger.info(f"Bulk load merged {cursor.rowcount} new articles in "
+                            f"{time.monotonic() - started:.1f}s")
+            finally:
+                self.conn.execute(f"PRAGMA temp_store = {STORAGE_PROFILES[self.profile]['temp_store']}")
+            self.conn.execute("DETACH DATABASE bulk")
+            os.remove(self.bulk_path)
+            self.bulk_path = None
+            if self.filter is not None:
+                self._load_filter()
+            return cursor.rowcount
+
+    def migrate_layout(self, layout: str) -> int:
+        """
+        Rebuild the articles table in another layout, in one transaction, and reclaim the space
+
+        Args:
+            layout: Key of ARTICLE_LAYOUTS
+
+        Returns:
+            Number of migrated articles
+        """
+        if layout not in ARTICLE_LAYOUTS:
+            raise ValueError(f"Unknown articles layout '{layout}', expected one of {tuple(ARTICLE_LAYOUTS)}")
+        with self.lock:
+            if layout == self.layout:
+                return self.count()
+            self.flush()
+            started = time.monotonic()
+            logger.info(f"Migrating articles from the '{self.layout}' to the '{layout}' layout")
+            try:
+                self.conn.execute("BEGIN")
+                self.conn.execute(create_table_sql('articles_migrated', ARTICLE_LAYOUTS[layout]))
+                # Sorted input keeps every B-tree insert an append
+                rows = self.conn.execute(
+                    "INSERT INTO articles_migrated (title) SELECT title FROM articles ORDER BY title"
+                ).rowcount
+                self.conn.execute("DROP TABLE articles")
+                self.conn.execute("ALTER TABLE articles_migrated RENAME TO articles")
+                if has_search_index(self.conn):
+                    # The search index still holds every title, only its triggers went with the old table
+                    create_search_index(self.conn)
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+            # Return the pages of the old table and index to the file system
+            self.conn.execute("VACUUM")
+            self.layout = layout
+            logger.info(f"Migrated {rows} articles in {time.monotonic() - started:.1f}s")
+            return rows
+
+    def enable_search(self):
+        """Build the title search index (if missing) and keep it in sync from now on"""
+        with self.lock:
+            self.flush()
+            create_search_index(self.conn)
+            self.conn.commit()
+
+    def count(self, exact: bool = False) -> int:
+        """
+        Number of stored articles
+
+        Args:
+            exact: Count the rows of the articles table (a full index scan) and
+                correct the maintained counter if it drifted, e.g. after manual edits
+
+        Returns:
+            Article count
+        """
+        with self.lock:
+            counted = self.conn.execute("SELECT value FROM article_stats WHERE name = 'articles'").fetchone()[0]
+            if not exact:
+                return counted
+            actual = self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            if actual != counted:
+                logger.warning(f"Article counter was {counted}, table holds {actual}; correcting it")
+                self.conn.execute("UPDATE article_stats SET value = ? WHERE name = 'articles'", (actual,))
+                self._written(0)
+            return actual
+
+    def last_title(self) -> Optional[str]:
+        """Alphabetically last stored title"""
+        with self.lock:
+            row = self.conn.execute("SELECT title FROM articles ORDER BY title DESC LIMIT 1").fetchone()
+            return row[0] if row else None
+
+    def title_at(self, offset: int) -> Optional[str]:
+        """Title at a position of the sorted title list"""
+        with self.lock:
+            row = self.conn.execute("SELECT title FROM articles ORDER BY title LIMIT 1 OFFSET ?",
+                                    (offset,)).fetchone()
+            return row[0] if row else None
+
+    def pending_ranges(self) -> List[Tuple[int, str]]:
+        """(range_id, next_url) of every unfinished crawl range"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT id, next_url FROM crawl_ranges WHERE done = 0 ORDER BY id"
+            ).fetchall()
+
+    def replace_ranges(self, ranges: List[Tuple[str, Optional[str], str]]) -> List[Tuple[int, str]]:
+        """
+        Replace the crawl plan
+
+        Args:
+            ranges: (start_title, end_title, first page URL) per range
+
+        Returns:
+            (range_id, first page URL) per range, in order
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM crawl_ranges")
+            # Parked pages of the old ranges would point at the ids of the new ones
+            self.conn.execute("DELETE FROM failed_pages WHERE range_id IS NOT NULL")
+            self.conn.executemany(
+                "INSERT INTO crawl_ranges (start_title, end_title, next_url) VALUES (?, ?, ?)", ranges
+            )
+            self.flush()
+            return self.conn.execute("SELECT id, next_url FROM crawl_ranges ORDER BY id").fetchall()
+
+    def update_range_cursor(self, range_id: int, next_url: Optional[str]):
+        """Record the next page of a range (None marks it done) in the open transaction"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE crawl_ranges SET next_url = ?, done = ? WHERE id = ?",
+                (next_url, int(next_url is None), range_id)
+            )
+            self._written(0)
+
+    def add_failed_page(self, url: str, range_id: Optional[int]):
+        """Queue a page whose fetch attempts were exhausted"""
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO failed_pages (url, range_id) VALUES (?, ?)
+                   ON CONFLICT(url) DO UPDATE SET failures = failures + 1, failed_at = CURRENT_TIMESTAMP""",
+                (url, range_id)
+            )
+            self.flush()
+
+    def drop_failed_pages(self, range_ids: List[int]):
+        """Forget the parked pages of ranges that are resumed from their cursor instead"""
+        with self.lock:
+            self.conn.executemany("DELETE FROM failed_pages WHERE range_id = ?", ((i,) for i in range_ids))
+            self.flush()
+
+    def take_failed_pages(self) -> List[Tuple[Optional[int], str]]:
+        """
+        Remove every queued failed page and return those still worth retrying as (range_id, url)
+
+        A page of a persisted range is only returned while it is that range's
+        cursor; once the range moved past it or finished, crawl_ranges is the
+        authority and the parked page is dropped.
+        """
+        with self.lock:
+            pages = self.conn.execute(
+                """SELECT f.range_id, f.url FROM failed_pages f
+                   LEFT JOIN crawl_ranges r ON r.id = f.range_id
+                   WHERE f.range_id IS NULL OR (r.done = 0 AND r.next_url = f.url)
+                   ORDER BY f.failed_at"""
+            ).fetchall()
+            self.conn.execute("DELETE FROM failed_pages")
+            self.flush()
+            return pages
+
+    def close(self):
+        """Commit outstanding work and close the connection"""
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+
+class WriterError(Exception):
+    """A background write failed; raised in the thread that queues or flushes writes"""
+
+
+class BackgroundWriter:
+    """Thread that owns all title and checkpoint writes of an ArticleStore"""
+
+    def __init__(self, store: ArticleStore, queue_size: int = 64, name: str = 'sqlite-writer'):
+        """
+        Start the writer thread
+
+        Args:
+            store: Store the writes are applied to
+            queue_size: Pages waiting to be written before callers block
+            name: Name of the writer thread
+        """
+        self.store = store
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.saved = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                # Wake up while idle so the commit interval also holds between pages
+                item = self.queue.get(timeout=self.store.commit_interval)
+            except queue.Empty:
+                self._apply('flush')
+                continue
+
+            if item is _DONE:
+                self.queue.task_done()
+                break
+            self._apply(*item)
+            self.queue.task_done()
+
+    def _apply(self, kind: str, *args):
+        # After a failure later writes are dropped, but the queue keeps draining so callers never hang
+        if self._error is not None:
+            return
+        try:
+            if kind == 'titles':
+                titles, = args
+                rows = self.store.save_titles(titles)
+                self.saved += rows
+                if self.store.bulk_path:
+                    logger.info(f"Staged {rows} new articles to database")
+                else:
+                    logger.info(f"Saved {rows} new articles to database ({len(titles) - rows} already stored)")
+            elif kind == 'cursor':
+                self.store.update_range_cursor(*args)
+            else:
+                self.store.flush()
+        except Exception as e:
+            logger.error(f"Background writer failed: {e}")
+            self._error = e
+
+    def _check(self):
+        if self._error is not None:
+            raise WriterError(f"Background write failed: {self._error}") from self._error
+
+    def save_titles(self, titles: List[str]):
+        """Queue titles for insertion, blocking while the queue is full"""
+        self._check()
+        self.queue.put(('titles', titles))
+
+    def update_range_cursor(self, range_id: int, next_url: Optional[str]):
+        """Queue a range checkpoint; it is applied after all titles queued before it"""
+        self._check()
+        self.queue.put(('cursor', range_id, next_url))
+
+    def flush(self):
+        """Wait until every queued write is applied and committed"""
+        self.queue.join()
+        self._check()
+        self.store.flush()
+
+    def close(self):
+        """Apply outstanding writes and stop the thread"""
+        if self._thread.is_alive():
+            self.queue.put(_DONE)
+            self._thread.join()
+        if self._error is not None:
+            logger.error(f"Background writer stopped after a failed write: {self._error}")
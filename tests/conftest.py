@@ -0,0 +1,37 @@
+"""Shared fixtures: a local stand-in wiki and scrapers on temporary databases"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from get_article_names import WikipediaScraper  # noqa: E402
+from mock_wiki import MockWikiServer, generate_titles  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def titles():
+    """Ten AllPages result pages worth of titles"""
+    return generate_titles(3450)
+
+
+@pytest.fixture
+def wiki(titles):
+    with MockWikiServer(titles) as server:
+        yield server
+
+
+@pytest.fixture
+def crawl(wiki):
+    """Run one crawl against the mock wiki as a separate process would: open, scrape, close"""
+
+    def run(db_path, max_pages=None, partitions=1, **kwargs):
+        scraper = WikipediaScraper(db_name=str(db_path), delay=0, base_url=wiki.base_url, **kwargs)
+        try:
+            scraper.scrape_all_articles(max_pages=max_pages, partitions=partitions)
+        finally:
+            scraper.close()
+
+    return run
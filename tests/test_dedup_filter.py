@@ -0,0 +1,61 @@
+"""In-memory dedup filter of stored titles"""
+
+import dedup_filter
+from dedup_filter import BYTES_PER_TITLE, TitleFilter
+from get_article_names import WikipediaScraper
+from mock_wiki import generate_titles
+
+
+def test_no_false_negatives_across_merges(monkeypatch):
+    monkeypatch.setattr(dedup_filter, '_MIN_MERGE', 8)
+    monkeypatch.setattr(dedup_filter, '_LOAD_CHUNK', 100)
+    titles = generate_titles(2000)
+    title_filter = TitleFilter()
+    title_filter.load(titles[:1000])
+    for title in titles[1000:]:
+        title_filter.add(title)
+
+    assert len(title_filter) == len(titles)
+    assert all(title in title_filter for title in titles)
+    assert sum(f"Unseen {i}" in title_filter for i in range(1000)) == 0
+
+
+def test_full_filter_stops_growing():
+    title_filter = TitleFilter(max_bytes=10 * BYTES_PER_TITLE)
+    title_filter.load(f"Title {i}" for i in range(8))
+    assert not title_filter.full
+    title_filter.load(f"More {i}" for i in range(8))
+    title_filter.add('Extra')
+
+    assert title_filter.full
+    assert len(title_filter) == 10
+    assert 'Extra' not in title_filter
+
+
+def test_filter_hits_are_confirmed_against_the_database(tmp_path):
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, background_writer=False,
+                               dedup_filter_bytes=1024 ** 2)
+    try:
+        store = scraper.store
+        assert store.save_titles(['Alpha', 'Beta']) == 2
+        # Stands in for a hash collision: the filter claims a title the database does not hold
+        store.filter.add('Gamma')
+        assert store.save_titles(['Alpha', 'Gamma']) == 1
+        assert store.skipped_titles == 1
+        assert store.count(exact=True) == 3
+    finally:
+        scraper.close()
+
+
+def test_recrawl_skips_stored_titles(tmp_path, wiki, crawl, titles):
+    db_path = str(tmp_path / 'articles.db')
+    crawl(db_path)
+
+    scraper = WikipediaScraper(db_name=db_path, delay=0, base_url=wiki.base_url, dedup_filter_bytes=1024 ** 2)
+    try:
+        scraper.scrape_all_articles(start_url=scraper.create_resume_url('!'))
+        scraper.flush_writes()
+        assert scraper.store.skipped_titles == len(titles)
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+    finally:
+        scraper.close()
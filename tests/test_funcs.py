@@ -0,0 +1,95 @@
+"""create_sqlite_db schema dicts: table options, indexes and pragmas"""
+
+import sqlite3
+
+import pytest
+
+from funcs import create_sqlite_db, create_table_sql
+
+
+POSTS = {
+    'columns': {
+        'user_id': {'type': 'INTEGER', 'not_null': True},
+        'slug': {'type': 'TEXT', 'not_null': True},
+        'title': {'type': 'TEXT', 'not_null': True},
+        'draft': {'type': 'INTEGER', 'default': 0},
+    },
+    'primary_key': ['user_id', 'slug'],
+    'without_rowid': True,
+    'strict': True,
+    'indexes': {
+        'posts_by_title': {'columns': ['title']},
+        'published_titles': {'columns': ['user_id', 'title'], 'unique': True, 'where': 'draft = 0'},
+    },
+}
+
+
+def _connect(tmp_path):
+    return sqlite3.connect(str(tmp_path / 'app.db'))
+
+
+def test_table_options_and_indexes(tmp_path):
+    assert create_sqlite_db('app', {'posts': POSTS}, db_path=str(tmp_path))
+
+    conn = _connect(tmp_path)
+    try:
+        sql, = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'posts'").fetchone()
+        assert sql == create_table_sql('posts', POSTS)
+        assert sql.endswith('WITHOUT ROWID, STRICT')
+        assert [row[5] for row in conn.execute("PRAGMA table_info(posts)")] == [1, 2, 0, 0]
+
+        indexes = {name: (unique, partial) for _, name, unique, _, partial in conn.execute("PRAGMA index_list(posts)")}
+        assert indexes['posts_by_title'] == (0, 0)
+        assert indexes['published_titles'] == (1, 1)
+
+        conn.execute("INSERT INTO posts (user_id, slug, title) VALUES (1, 'a', 'Hello')")
+        # STRICT rejects values of the wrong type
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO posts (user_id, slug, title) VALUES ('one', 'b', 'Hello')")
+        # The partial unique index only covers published posts
+        conn.execute("INSERT INTO posts (user_id, slug, title, draft) VALUES (1, 'c', 'Hello', 1)")
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO posts (user_id, slug, title) VALUES (1, 'd', 'Hello')")
+    finally:
+        conn.close()
+
+
+def test_indexes_are_added_to_existing_tables(tmp_path):
+    columns = {'id': {'type': 'INTEGER', 'primary_key': True}, 'name': {'type': 'TEXT'}}
+    assert create_sqlite_db('app', {'users': columns}, db_path=str(tmp_path))
+    assert create_sqlite_db('app', {'users': {'columns': columns, 'indexes': {'users_by_name': {'columns': ['name']}}}},
+                            db_path=str(tmp_path))
+
+    conn = _connect(tmp_path)
+    try:
+        assert [row[1] for row in conn.execute("PRAGMA index_list(users)")] == ['users_by_name']
+    finally:
+        conn.close()
+
+
+def test_pragmas_apply_to_a_new_database(tmp_path):
+    pragmas = {'journal_mode': 'WAL', 'page_size': 8192, 'auto_vacuum': 'INCREMENTAL'}
+    assert create_sqlite_db('app', {'t': {'x': {'type': 'TEXT'}}}, db_path=str(tmp_path), pragmas=pragmas)
+
+    conn = _connect(tmp_path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_failed_schema_leaves_the_database_unchanged(tmp_path):
+    schema = {
+        'first': {'x': {'type': 'TEXT'}},
+        # STRICT tables only accept the standard column types
+        'second': {'columns': {'x': {'type': 'VARCHAR(10)'}}, 'strict': True},
+    }
+    assert not create_sqlite_db('app', schema, db_path=str(tmp_path))
+
+    conn = _connect(tmp_path)
+    try:
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    finally:
+        conn.close()
@@ -0,0 +1,118 @@
+"""Ingest log recovery: torn records, idempotent replay and checkpoint ordering"""
+
+import json
+import os
+import sqlite3
+import zlib
+
+import pytest
+
+from get_article_names import WikipediaScraper
+from ingest_log import _FRAME, MAGIC, IngestLog, read_segment, replay_log, replay_segment, segment_paths
+
+
+def _record(payload: dict) -> bytes:
+    data = json.dumps(payload).encode('utf-8')
+    return _FRAME.pack(len(data), zlib.crc32(data)) + data
+
+
+def _write_segment(path, records):
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for record in records:
+            f.write(_record(record))
+
+
+@pytest.fixture
+def store(tmp_path):
+    """ArticleStore of a new database with a single crawl range"""
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, background_writer=False)
+    scraper.store.replace_ranges([('!', None, 'page-1')])
+    yield scraper.store
+    scraper.close()
+
+
+def _range_cursor(store):
+    return store.conn.execute("SELECT id, next_url, done FROM crawl_ranges").fetchone()
+
+
+def test_torn_tail_record_is_discarded(tmp_path, store):
+    range_id = _range_cursor(store)[0]
+    log_path = str(tmp_path / 'ingest.log')
+    segment = f"{log_path}.000001"
+    _write_segment(segment, [
+        {'titles': ['Alpha', 'Beta']},
+        {'range': range_id, 'next': 'page-2'},
+        {'titles': ['Gamma']},
+        {'range': range_id, 'next': 'page-3'},
+    ])
+    # A crash in the middle of the last record leaves only part of it on disk
+    with open(segment, 'r+b') as f:
+        f.truncate(os.path.getsize(segment) - 5)
+
+    assert [record.get('titles') for record in read_segment(segment)] == [['Alpha', 'Beta'], None, ['Gamma']]
+    assert replay_log(store, log_path) == 3
+    assert segment_paths(log_path) == []
+    assert store.count(exact=True) == 3
+    assert _range_cursor(store) == (range_id, 'page-2', 0)
+
+
+def test_corrupt_record_ends_the_segment(tmp_path, store):
+    segment = str(tmp_path / 'ingest.log.000001')
+    _write_segment(segment, [{'titles': ['Alpha']}, {'titles': ['Beta']}])
+    with open(segment, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'!')
+
+    assert list(read_segment(segment)) == [{'titles': ['Alpha']}]
+
+
+def test_replay_is_idempotent(tmp_path, store):
+    range_id = _range_cursor(store)[0]
+    segment = str(tmp_path / 'ingest.log.000001')
+    _write_segment(segment, [
+        {'titles': ['Delta', 'Alpha']},
+        {'range': range_id, 'next': 'page-2'},
+        {'titles': ['Beta']},
+        {'range': range_id, 'next': None},
+    ])
+
+    assert replay_segment(store, segment) == 3
+    # A crash between the commit and deleting the segment replays it again on the next run
+    assert replay_segment(store, segment) == 0
+    assert store.count() == store.count(exact=True) == 3
+    assert _range_cursor(store) == (range_id, None, 1)
+
+
+def test_checkpoints_apply_after_the_titles_of_their_segment(tmp_path, store):
+    range_id = _range_cursor(store)[0]
+    segment = str(tmp_path / 'ingest.log.000001')
+    _write_segment(segment, [
+        {'range': range_id, 'next': 'page-2'},
+        {'titles': ['Alpha']},
+    ])
+    # A title that violates a trigger makes the replay fail before any checkpoint is applied
+    store.conn.execute("""CREATE TRIGGER reject_alpha BEFORE INSERT ON articles
+                          WHEN NEW.title = 'Alpha' BEGIN SELECT RAISE(ABORT, 'rejected'); END""")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        replay_segment(store, segment)
+    assert _range_cursor(store) == (range_id, 'page-1', 0)
+    assert store.count(exact=True) == 0
+
+
+def test_segments_of_a_crashed_run_are_replayed_on_open(tmp_path, store):
+    range_id = _range_cursor(store)[0]
+    log_path = str(tmp_path / 'ingest.log')
+    _write_segment(f"{log_path}.000001", [{'titles': ['Alpha']}, {'range': range_id, 'next': 'page-2'}])
+    _write_segment(f"{log_path}.000002", [{'titles': ['Beta']}, {'range': range_id, 'next': 'page-3'}])
+
+    log = IngestLog(store, log_path)
+    log.save_titles(['Gamma'])
+    log.update_range_cursor(range_id, None)
+    log.close()
+
+    assert segment_paths(log_path) == []
+    assert [title for title, in store.conn.execute("SELECT title FROM articles ORDER BY title")] == \
+        ['Alpha', 'Beta', 'Gamma']
+    assert _range_cursor(store) == (range_id, None, 1)
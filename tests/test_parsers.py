@@ -0,0 +1,79 @@
+"""HTML parser backends and the streaming parser"""
+
+import pytest
+import requests
+
+from get_article_names import WikipediaScraper
+from mock_wiki import generate_titles, render_allpages_html
+from parsers import PARSERS, StreamingAllPagesParser, available_parsers, get_parser, iter_stream_titles, parse_page
+from retry import RetryPolicy
+
+
+BASE_URL = "https://en.wikipedia.org"
+# Titles that need escaping or are not ASCII
+TRICKY_TITLES = ['AT&T', 'Café "Noir"', "O'Brien", 'Zürich 1', 'Ω <small>', '東京']
+
+
+@pytest.fixture(scope='module')
+def page():
+    titles = sorted(generate_titles(50) + TRICKY_TITLES)
+    return titles, render_allpages_html(titles, next_title='Ärger & Co').encode('utf-8')
+
+
+@pytest.mark.parametrize('name', list(PARSERS))
+def test_backends_agree_with_the_reference_parser(name, page):
+    if name not in available_parsers():
+        pytest.skip(f"{name} is not installed")
+    titles, content = page
+    parse = get_parser(name)
+
+    assert parse(content, BASE_URL) == get_parser('html.parser')(content, BASE_URL)
+    parsed_titles, next_url = parse(content, BASE_URL)
+    assert parsed_titles == titles
+    assert next_url == f"{BASE_URL}/w/index.php?title=Special:AllPages&from=%C3%84rger+%26+Co"
+    # The last page has no next link
+    assert parse(render_allpages_html(titles).encode('utf-8'), BASE_URL) == (titles, None)
+
+
+def test_process_pool_entry_point_matches(page):
+    _, content = page
+    for name in available_parsers():
+        assert parse_page(name, content, BASE_URL) == get_parser(name)(content, BASE_URL)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 100, 16384])
+def test_stream_parser_is_independent_of_chunking(chunk_size, page):
+    _, content = page
+    parser = StreamingAllPagesParser(BASE_URL)
+    chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+
+    # Small chunks split tags, entities and multi-byte characters
+    streamed = [title for batch in iter_stream_titles(chunks, parser) for title in batch]
+    assert (streamed, parser.next_url) == get_parser('html.parser')(content, BASE_URL)
+
+
+def test_dropped_stream_is_retried_with_a_fresh_parser(tmp_path, wiki, titles, monkeypatch):
+    iter_content = requests.Response.iter_content
+    dropped = []
+
+    def flaky_iter_content(response, *args, **kwargs):
+        chunks = iter_content(response, *args, **kwargs)
+        if not dropped:
+            # The connection drops after the first chunk of the first page
+            dropped.append(response.url)
+            yield next(chunks)
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+        yield from chunks
+
+    monkeypatch.setattr(requests.Response, 'iter_content', flaky_iter_content)
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, base_url=wiki.base_url,
+                               parser='stream')
+    scraper.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+    try:
+        scraper.scrape_all_articles(retry_rounds=0)
+        scraper.flush_writes()
+        assert dropped
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+        assert wiki.requests_served == -(-len(titles) // wiki.page_size) + 1
+    finally:
+        scraper.close()
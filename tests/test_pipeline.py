@@ -0,0 +1,48 @@
+"""Pipeline engine: pages of a range are stored in crawl order"""
+
+import time
+
+from get_article_names import WikipediaScraper
+from pipeline import CrawlPipeline
+
+
+def test_parser_threads_store_pages_in_order(tmp_path, wiki, titles, monkeypatch):
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, base_url=wiki.base_url,
+                               engine='pipeline', parse_workers=3, queue_size=1, background_writer=False)
+    delayed = []
+    put = CrawlPipeline._put
+    save_articles = scraper._save_articles_to_db
+    update_cursor = scraper._update_range_cursor
+    writes = []
+
+    def delayed_put(pipeline, q, item):
+        # The parser of the first page stalls before queueing its write, giving
+        # the other parser threads every chance to overtake it
+        if q is pipeline.write_queue and not delayed:
+            delayed.append(item)
+            time.sleep(0.3)
+        put(pipeline, q, item)
+
+    def slow_save(articles):
+        time.sleep(0.01)
+        writes.append(articles[0]['title'])
+        save_articles(articles)
+
+    def checked_update(range_id, next_url):
+        if next_url is not None:
+            # The cursor may only pass pages whose titles are already written
+            start = scraper.source.start_title(next_url)
+            assert scraper.store.conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE title < ?", (start,)
+            ).fetchone()[0] == sum(title < start for title in titles)
+        update_cursor(range_id, next_url)
+
+    monkeypatch.setattr(CrawlPipeline, '_put', delayed_put)
+    scraper._save_articles_to_db = slow_save
+    scraper._update_range_cursor = checked_update
+    try:
+        scraper.scrape_all_articles()
+        assert writes == sorted(writes)
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+    finally:
+        scraper.close()
@@ -0,0 +1,71 @@
+"""Token-bucket rate limiting shared by all crawl workers"""
+
+import threading
+import time
+
+import pytest
+
+from get_article_names import WikipediaScraper
+from rate_limit import AdaptiveRateLimiter, TokenBucket
+
+
+def test_reservations_queue_one_interval_apart():
+    bucket = TokenBucket(rate=10, burst=1)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[0] == 0
+    assert waits[1:] == pytest.approx([0.1, 0.2, 0.3], abs=0.01)
+
+
+def test_burst_is_sent_back_to_back():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(rate=0)
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+def test_rate_is_shared_by_threads():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 19 / 50 - 0.01
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveRateLimiter(rate=8, min_rate=1, recovery_step=2)
+    limiter.on_response(429)
+    assert limiter.rate == 4
+    for _ in range(5):
+        limiter.on_response(503)
+    assert limiter.rate == 1
+    limiter.on_response(200)
+    assert limiter.rate == 3
+    for _ in range(5):
+        limiter.on_response(200)
+    assert limiter.rate == 8
+
+
+def test_crawl_respects_the_request_rate(tmp_path, wiki):
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, rate=20, base_url=wiki.base_url)
+    try:
+        started = time.monotonic()
+        scraper.scrape_all_articles()
+        elapsed = time.monotonic() - started
+    finally:
+        scraper.close()
+    assert wiki.requests_served == 10
+    # The first request goes out at once, the other nine one interval apart
+    assert elapsed >= 9 / 20 - 0.01
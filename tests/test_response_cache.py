@@ -0,0 +1,54 @@
+"""Persistent response cache and offline rebuild"""
+
+import os
+
+from get_article_names import WikipediaScraper
+from response_cache import ResponseCache
+
+
+def test_round_trip_survives_reopening(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache'), codec='gzip')
+    assert cache.get('https://example.org/a') is None
+    cache.put('https://example.org/a', b'<html>a</html>')
+    assert cache.get('https://example.org/a') == b'<html>a</html>'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    reopened = ResponseCache(str(tmp_path / 'cache'), codec='gzip')
+    assert reopened.size_bytes == cache.size_bytes
+    assert list(reopened) == [('https://example.org/a', b'<html>a</html>')]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache'), codec='gzip')
+    bodies = {f"https://example.org/{i}": os.urandom(1000) for i in range(4)}
+    for i, (url, body) in enumerate(bodies.items()):
+        cache.put(url, body)
+        os.utime(cache._path(url, 'gzip'), (i, i))
+    # Reading the oldest entry makes it the most recently used one
+    assert cache.get('https://example.org/0') is not None
+    cache.max_bytes = cache.size_bytes - 1
+    cache.put('https://example.org/4', os.urandom(1000))
+
+    assert cache.size_bytes <= cache.max_bytes
+    assert cache.get('https://example.org/0') is not None
+    assert cache.get('https://example.org/1') is None
+
+
+def test_cached_crawl_rebuilds_offline(tmp_path, wiki, titles):
+    cache_dir = str(tmp_path / 'cache')
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'crawled.db'), delay=0, base_url=wiki.base_url,
+                               cache_dir=cache_dir)
+    try:
+        scraper.scrape_all_articles()
+    finally:
+        scraper.close()
+    served = wiki.requests_served
+
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'rebuilt.db'), delay=0, base_url=wiki.base_url,
+                               cache_dir=cache_dir)
+    try:
+        assert scraper.rebuild_from_cache() == served
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+    finally:
+        scraper.close()
+    assert wiki.requests_served == served
@@ -0,0 +1,77 @@
+"""Interrupted crawls resume from crawl_ranges without fetching a page twice"""
+
+import pytest
+
+from get_article_names import WikipediaScraper
+from sharding import ShardReader
+
+
+CONFIGS = {
+    'plain': dict(partitions=1),
+    'partitioned': dict(partitions=3),
+    'sharded': dict(partitions=3, shards=3),
+    'ingest-log': dict(partitions=1, ingest_log='ingest.log'),
+}
+
+
+def _options(tmp_path, name):
+    options = dict(CONFIGS[name])
+    if 'ingest_log' in options:
+        options['ingest_log'] = str(tmp_path / options['ingest_log'])
+    return options
+
+
+def _stored_titles(db_path, sharded):
+    if sharded:
+        with ShardReader(str(db_path)) as reader:
+            return list(reader.titles())
+    scraper = WikipediaScraper(db_name=str(db_path), delay=0)
+    try:
+        return [title for title, in scraper.store.conn.execute("SELECT title FROM articles ORDER BY title")]
+    finally:
+        scraper.close()
+
+
+@pytest.mark.parametrize('name', list(CONFIGS))
+def test_resume_fetches_exactly_the_remaining_pages(tmp_path, wiki, crawl, titles, name):
+    crawl(tmp_path / 'full.db', **_options(tmp_path / 'full', name))
+    full_requests = wiki.requests_served
+
+    wiki.requests_served = 0
+    db_path = tmp_path / 'resumed.db'
+    options = _options(tmp_path, name)
+    crawl(db_path, max_pages=4, **options)
+    assert wiki.requests_served == 4
+    crawl(db_path, **options)
+
+    assert wiki.requests_served == full_requests
+    assert _stored_titles(db_path, 'shards' in options) == sorted(titles)
+
+
+def test_finished_crawl_fetches_nothing_on_restart(tmp_path, wiki, crawl, titles):
+    db_path = tmp_path / 'articles.db'
+    crawl(db_path, partitions=3)
+    served = wiki.requests_served
+
+    scraper = WikipediaScraper(db_name=str(db_path), delay=0, base_url=wiki.base_url)
+    try:
+        assert not scraper.has_checkpoint()
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+    finally:
+        scraper.close()
+    assert wiki.requests_served == served
+
+
+@pytest.mark.parametrize('options', [
+    dict(engine='sync'),
+    dict(engine='sync', parser='stream'),
+    dict(engine='async', concurrency=3),
+    dict(engine='pipeline'),
+    dict(engine='sync', backend='api'),
+], ids=['sync', 'stream', 'async', 'pipeline', 'api'])
+def test_ranges_stop_at_their_upper_bound(tmp_path, wiki, crawl, titles, options):
+    crawl(tmp_path / 'articles.db', partitions=3, **options)
+
+    page_size = wiki.api_limit if options.get('backend') == 'api' else wiki.page_size
+    # Next links do not repeat `to`; at most one partial page per extra range
+    assert wiki.requests_served <= -(-len(titles) // page_size) + 2
@@ -0,0 +1,95 @@
+"""Retry layer: backoff, Retry-After, maxlag and parked pages"""
+
+from email.utils import formatdate
+import time
+
+import pytest
+import requests
+
+from get_article_names import WikipediaScraper
+from mock_wiki import MockWikiServer
+from retry import RetryPolicy, parse_retry_after, retry_reason
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+
+
+@pytest.mark.parametrize('status, headers, retried', [
+    (200, {}, False),
+    (404, {}, False),
+    (429, {}, True),
+    (503, {}, True),
+    (200, {'MediaWiki-API-Error': 'maxlag'}, True),
+    (503, {'X-Database-Lag': '7'}, True),
+])
+def test_retry_reason(status, headers, retried):
+    assert (retry_reason(status, requests.structures.CaseInsensitiveDict(headers)) is not None) == retried
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    for attempt in range(6):
+        assert 0 <= policy.backoff(attempt) <= 4.0
+        assert policy.backoff(attempt, retry_after=10.0) == 10.0
+
+
+def test_flaky_server_is_retried_after_its_retry_after(tmp_path, titles):
+    with MockWikiServer(titles, failure_rate=0.3) as wiki:
+        scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, base_url=wiki.base_url)
+        scraper.retry_policy = RetryPolicy(max_attempts=10, base_delay=0.01, max_delay=0.05)
+        try:
+            started = time.monotonic()
+            scraper.scrape_all_articles(retry_rounds=0)
+            failures = wiki.requests_served - -(-len(titles) // wiki.page_size)
+            assert failures > 0
+            # Every 503 carries Retry-After: 1, which wins over the much shorter backoff
+            assert time.monotonic() - started >= failures
+            assert scraper.get_total_articles_count(exact=True) == len(titles)
+            assert scraper.store.take_failed_pages() == []
+        finally:
+            scraper.close()
+
+
+def test_client_errors_are_not_parked(tmp_path, wiki):
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, base_url=wiki.base_url)
+    try:
+        scraper.scrape_all_articles(start_url=f"{wiki.base_url}/w/index.php?title=Missing", retry_rounds=0)
+        assert wiki.requests_served == 1
+        assert scraper.store.take_failed_pages() == []
+    finally:
+        scraper.close()
+
+
+def test_parked_page_resumes_without_refetching(tmp_path, wiki, crawl, titles, monkeypatch):
+    get = requests.Session.get
+    calls = []
+
+    def get_failing_third_page(session, url, **kwargs):
+        calls.append(url)
+        if len(calls) == 3:
+            raise requests.ConnectionError("Connection reset")
+        return get(session, url, **kwargs)
+
+    db_path = tmp_path / 'articles.db'
+    monkeypatch.setattr(requests.Session, 'get', get_failing_third_page)
+    scraper = WikipediaScraper(db_name=str(db_path), delay=0, base_url=wiki.base_url, max_attempts=1)
+    try:
+        scraper.scrape_all_articles(retry_rounds=0)
+    finally:
+        scraper.close()
+    assert wiki.requests_served == 2
+
+    # The parked page is the cursor of its range, so the next run continues from it exactly once
+    crawl(db_path)
+    assert wiki.requests_served == -(-len(titles) // wiki.page_size)
+    scraper = WikipediaScraper(db_name=str(db_path), delay=0)
+    try:
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+        assert not scraper.has_checkpoint()
+    finally:
+        scraper.close()
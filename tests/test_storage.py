@@ -0,0 +1,12 @@
+"""ArticleStore settings and the background writer"""
+
+import pytest
+
+from get_article_names import WikipediaScraper
+
+
+@pytest.mark.parametrize('commit_interval', [0, -1.0])
+def test_non_positive_commit_interval_is_rejected(tmp_path, commit_interval):
+    # The idle background writer wakes up every commit_interval seconds
+    with pytest.raises(ValueError, match='commit_interval'):
+        WikipediaScraper(db_name=str(tmp_path / 'articles.db'), delay=0, commit_interval=commit_interval)
@@ -0,0 +1,72 @@
+"""Front-coded title archive: round trips, lookups and prefix scans"""
+
+import pytest
+
+from get_article_names import WikipediaScraper
+from mock_wiki import generate_titles
+from title_archive import TitleArchive, write_archive
+
+
+@pytest.fixture(scope='module')
+def archived_titles():
+    # UTF-8 byte order, as ORDER BY title returns them
+    return sorted(generate_titles(1000) + ['Café', 'Cafe', 'Zürich', '東京', 'Ω'], key=lambda t: t.encode('utf-8'))
+
+
+def test_round_trip(tmp_path, archived_titles):
+    path = str(tmp_path / 'titles.wta')
+    assert write_archive(archived_titles, path, block_size=16) == len(archived_titles)
+
+    with TitleArchive(path) as archive:
+        assert len(archive) == len(archived_titles)
+        assert archive.blocks == -(-len(archived_titles) // 16)
+        assert list(archive) == archived_titles
+        assert all(title in archive for title in archived_titles[::7])
+        assert 'Not A Title' not in archive
+        assert '' not in archive
+
+
+@pytest.mark.parametrize('prefix, limit', [('Castle', None), ('Castle', 5), ('Caf', None), ('Zz', None), ('', 3)])
+def test_prefix_scans_across_blocks(tmp_path, archived_titles, prefix, limit):
+    path = str(tmp_path / 'titles.wta')
+    write_archive(archived_titles, path, block_size=16)
+    expected = [title for title in archived_titles if title.startswith(prefix)][:limit]
+
+    with TitleArchive(path) as archive:
+        assert list(archive.prefix(prefix, limit)) == expected
+
+
+def test_unsorted_or_duplicate_titles_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_archive(['B', 'A'], str(tmp_path / 'unsorted.wta'))
+    with pytest.raises(ValueError):
+        write_archive(['A', 'A'], str(tmp_path / 'duplicate.wta'))
+
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / 'empty.wta')
+    assert write_archive([], path) == 0
+    with TitleArchive(path) as archive:
+        assert list(archive) == []
+        assert 'A' not in archive
+        assert list(archive.prefix('A')) == []
+
+
+@pytest.mark.parametrize('shards', [0, 3])
+def test_database_export_imports_into_a_new_database(tmp_path, crawl, titles, shards):
+    crawl(tmp_path / 'crawled.db', shards=shards)
+    path = str(tmp_path / 'titles.wta')
+
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'crawled.db'), delay=0)
+    try:
+        assert scraper.export_archive(path) == len(titles)
+    finally:
+        scraper.close()
+
+    scraper = WikipediaScraper(db_name=str(tmp_path / 'imported.db'), delay=0)
+    try:
+        assert scraper.import_archive(path) == len(titles)
+        assert scraper.import_archive(path) == 0
+        assert scraper.get_total_articles_count(exact=True) == len(titles)
+    finally:
+        scraper.close()
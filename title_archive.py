@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Title Archive
+
+Compact, read-only export format for the sorted title list. Titles are
+written in UTF-8 byte order (SQLite's BINARY collation) in blocks of
+``block_size``; inside a block each title is front-coded against the one
+before it (shared prefix length + remaining suffix) and the block is then
+zlib-compressed. A sparse index holding the first title and file offset of
+every block sits at the end of the file, so a lookup or prefix scan binary
+searches the index and decompresses a single block.
+
+File layout::
+
+    header   MAGIC, version, block_size, title count, index offset, block count
+    blocks   zlib(varint shared, varint suffix length, suffix bytes) per title
+    index    per block: varint first-title length, first title, offset, compressed size
+"""
+
+import bisect
+import logging
+import sqlite3
+import struct
+import time
+import zlib
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'WTA1'
+VERSION = 1
+# magic, version, block_size, title count, index offset, block count
+_HEADER = struct.Struct('<4sHHQQI')
+_INDEX_ENTRY = struct.Struct('<QI')
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _encode_block(titles: List[bytes]) -> bytes:
+    out = bytearray()
+    previous = b''
+    for title in titles:
+        shared = 0
+        limit = min(len(previous), len(title))
+        while shared < limit and previous[shared] == title[shared]:
+            shared += 1
+        _write_varint(out, shared)
+        _write_varint(out, len(title) - shared)
+        out += title[shared:]
+        previous = title
+    return bytes(out)
+
+
+def _decode_block(data: bytes) -> List[str]:
+    titles = []
+    previous = b''
+    pos = 0
+    while pos < len(data):
+        shared, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        previous = previous[:shared] + data[pos:pos + length]
+        pos += length
+        titles.append(previous.decode('utf-8'))
+    return titles
+
+
+def write_archive(titles: Iterable[str], path: str, block_size: int = 256, level: int = 9) -> int:
+    """
+    Write titles to an archive file
+
+    Args:
+        titles: Titles in ascending UTF-8 byte order (e.g. ORDER BY title), without duplicates
+        path: Output file
+        block_size: Titles per front-coded block
+        level: zlib compression level
+
+    Returns:
+        Number of titles written
+    """
+    index = []
+    count = 0
+    block = []
+    previous = None
+
+    with open(path, 'wb') as f:
+        f.write(b'\0' * _HEADER.size)
+
+        def flush_block():
+            data = zlib.compress(_encode_block(block), level)
+            index.append((block[0], f.tell(), len(data)))
+            f.write(data)
+            block.clear()
+
+        for title in titles:
+            encoded = title.encode('utf-8')
+            if previous is not None and encoded <= previous:
+                raise ValueError(f"Titles must be unique and sorted, got '{title}' after '{previous.decode()}'")
+            previous = encoded
+            block.append(encoded)
+            count += 1
+            if len(block) == block_size:
+                flush_block()
+        if block:
+            flush_block()
+
+        index_offset = f.tell()
+        out = bytearray()
+        for first, offset, size in index:
+            _write_varint(out, len(first))
+            out += first
+            out += _INDEX_ENTRY.pack(offset, size)
+        f.write(out)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, block_size, count, index_offset, len(index)))
+
+    logger.info(f"Wrote {count} titles in {len(index)} blocks to {path}")
+    return count
+
+
+def export_archive(db_name: str, path: str, block_size: int = 256) -> int:
+    """
+    Export the articles table of a database to an archive
+
+    Uses its own read connection, so a running crawl (WAL) is not blocked.
+
+    Args:
+        db_name: SQLite database file
+        path: Output file
+        block_size: Titles per front-coded block
+
+    Returns:
+        Number of titles exported
+    """
+    conn = sqlite3.connect(db_name)
+    try:
+        cursor = conn.execute("SELECT title FROM articles ORDER BY title")
+        return write_archive((title for title, in cursor), path, block_size=block_size)
+    finally:
+        conn.close()
+
+
+def import_archive(store, path: str, batch_size: int = 100000) -> int:
+    """
+    Insert every title of an archive into the articles table
+
+    Args:
+        store: ArticleStore of the target database
+        path: Archive file
+        batch_size: Titles per INSERT batch
+
+    Returns:
+        Number of new articles inserted
+    """
+    inserted = 0
+    start = time.monotonic()
+    with TitleArchive(path) as archive:
+        titles = iter(archive)
+        while True:
+            batch = list(islice(titles, batch_size))
+            if not batch:
+                break
+            inserted += store.save_titles(batch)
+        store.flush()
+        logger.info(f"Imported {inserted} new articles from {len(archive)} archived titles "
+                    f"in {time.monotonic() - start:.1f}s")
+    return inserted
+
+
+class TitleArchive:
+    """Read access to an archive; only the sparse index is kept in memory"""
+
+    def __init__(self, path: str):
+        """
+        Open an archive and load its block index
+
+        Args:
+            path: Archive file
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, version, self.block_size, self.count, index_offset, blocks = _HEADER.unpack(
+            self._file.read(_HEADER.size)
+        )
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a title archive (version {VERSION})")
+
+        self._file.seek(index_offset)
+        data = self._file.read()
+        self._first_titles = []
+        self._blocks = []
+        pos = 0
+        for _ in range(blocks):
+            length, pos = _read_varint(data, pos)
+            self._first_titles.append(data[pos:pos + length])
+            pos += length
+            self._blocks.append(_INDEX_ENTRY.unpack_from(data, pos))
+            pos += _INDEX_ENTRY.size
+        self._cached = (None, None)
+
+    def _block(self, number: int) -> List[str]:
+        """Decompressed titles of one block (the last block read is cached)"""
+        if self._cached[0] != number:
+            offset, size = self._blocks[number]
+            self._file.seek(offset)
+            self._cached = (number, _decode_block(zlib.decompress(self._file.read(size))))
+        return self._cached[1]
+
+    def _find_block(self, key: bytes) -> int:
+        """Number of the block that would hold key"""
+        return max(bisect.bisect_right(self._first_titles, key) - 1, 0)
+
+    @property
+    def blocks(self) -> int:
+        """Number of compressed blocks"""
+        return len(self._blocks)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, title: str) -> bool:
+        if not self._blocks:
+            return False
+        titles = self._block(self._find_block(title.encode('utf-8')))
+        i = bisect.bisect_left(titles, title)
+        return i < len(titles) and titles[i] == title
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(len(self._blocks)):
+            yield from self._block(number)
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> Iterator[str]:
+        """
+        Titles starting with prefix, in order
+
+        Args:
+            prefix: Title prefix
+            limit: Maximum number of titles (None for all)
+
+        Yields:
+            Matching titles
+        """
+        if not self._blocks:
+            return
+        found = 0
+        number = self._find_block(prefix.encode('utf-8'))
+        titles = self._block(number)
+        i = bisect.bisect_left(titles, prefix)
+        while number < len(self._blocks):
+            for title in titles[i:]:
+                if not title.startswith(prefix) or (limit is not None and found >= limit):
+                    return
+                yield title
+                found += 1
+            number += 1
+            i = 0
+            if number < len(self._blocks):
+                titles = self._block(number)
+
+    def close(self):
+        """Close the archive file"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    """Look up titles or scan a prefix in an archive"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query a title archive')
+    parser.add_argument('archive', help='Archive file written by --export-archive')
+    parser.add_argument('--lookup', type=str, help='Check whether a title exists')
+    parser.add_argument('--prefix', type=str, help='List titles starting with a prefix')
+    parser.add_argument('--limit', type=int, default=50, help='Maximum titles listed for --prefix')
+    args = parser.parse_args()
+
+    with TitleArchive(args.archive) as archive:
+        if args.lookup is not None:
+            print(f"'{args.lookup}': {'found' if args.lookup in archive else 'not found'}")
+        elif args.prefix is not None:
+            for title in archive.prefix(args.prefix, args.limit):
+                print(title)
+        else:
+            print(f"{len(archive)} titles in {archive.blocks} blocks of {archive.block_size}")
+
+
+if __name__ == "__main__":
+    main()
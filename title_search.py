@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Title Search
+
+Optional full-text index over article titles. ``articles_fts`` is an FTS5
+table with the trigram tokenizer, so any substring of three or more
+characters is an index lookup (case-insensitive). Triggers on the articles
+table add every newly inserted title inside the writer's own transaction,
+keeping the index in sync incrementally whatever the write path.
+
+Prefix queries need no extra index: they are range scans over the title
+B-tree (the UNIQUE index or the WITHOUT ROWID primary key).
+"""
+
+import logging
+import sqlite3
+from typing import List
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'articles_fts'
+
+_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO {SEARCH_TABLE} (title) VALUES (new.title);
+    END""",
+    # Articles are never deleted by the scraper; this keeps manual edits consistent (and is a scan)
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON articles BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE title = old.title;
+    END""",
+)
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    """Whether the database has a title search index"""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,)).fetchone() is not None
+
+
+def create_search_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the search index and its triggers, indexing all existing titles
+
+    Runs in the caller's transaction; also restores the triggers when the
+    articles table was rebuilt.
+
+    Args:
+        conn: Connection to the articles database
+
+    Returns:
+        True if the index was newly built
+    """
+    created = not has_search_index(conn)
+    if created:
+        conn.execute(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, tokenize='trigram')")
+        conn.execute(f"INSERT INTO {SEARCH_TABLE} (title) SELECT title FROM articles")
+        logger.info("Built title search index")
+    for trigger in _TRIGGERS:
+        conn.execute(trigger)
+    return created
+
+
+def drop_search_index(conn: sqlite3.Connection):
+    """Remove the search index and its triggers"""
+    conn.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert")
+    conn.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete")
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def search_titles(conn: sqlite3.Connection, query: str, limit: int = 20, ranked: bool = False,
+                  schema: str = 'main') -> List[str]:
+    """
+    Titles containing query, ignoring case
+
+    Args:
+        conn: Connection to a database with a search index
+        query: Substring to look for
+        limit: Maximum number of titles
+        ranked: Order by BM25 relevance; this scores every match instead of
+            stopping after `limit`, so common substrings take far longer
+        schema: Database of the connection holding the index (e.g. an attached shard)
+
+    Returns:
+        Matching titles
+    """
+    if len(query) < 3:
+        # Trigrams cannot match shorter strings; LIKE scans until `limit` titles are found
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        rows = conn.execute(
+            f"SELECT title FROM {schema}.{SEARCH_TABLE} WHERE title LIKE ? ESCAPE '\\' LIMIT ?",
+            (f"%{escaped}%", limit)
+        )
+    else:
+        phrase = '"' + query.replace('"', '""') + '"'
+        order = "ORDER BY rank" if ranked else ""
+        rows = conn.execute(
+            f"SELECT title FROM {schema}.{SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ? {order} LIMIT ?",
+            (phrase, limit)
+        )
+    return [title for title, in rows]
+
+
+def prefix_titles(conn: sqlite3.Connection, prefix: str, limit: int = 20, schema: str = 'main') -> List[str]:
+    """
+    Titles starting with prefix (case-sensitive), in order
+
+    Args:
+        conn: Connection to the articles database
+        prefix: Title prefix
+        limit: Maximum number of titles
+        schema: Database of the connection holding the articles table
+
+    Returns:
+        Matching titles
+    """
+    if not prefix:
+        rows = conn.execute(f"SELECT title FROM {schema}.articles ORDER BY title LIMIT ?", (limit,))
+    else:
+        # Every title with the prefix sorts before the prefix with its last character incremented
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code < 0xE000:
+            code = 0xE000   # surrogates cannot be encoded; the next character is U+E000
+        upper = prefix[:-1] + chr(code)
+        rows = conn.execute(
+            f"SELECT title FROM {schema}.articles WHERE title >= ? AND title < ? ORDER BY title LIMIT ?",
+            (prefix, upper, limit)
+        )
+    return [title for title, in rows]
+
+
+class TitleSearch:
+    """Read-only query connection; under WAL it never waits for the crawl's writer"""
+
+    def __init__(self, db_name: str):
+        """
+        Args:
+            db_name: SQLite database file
+        """
+        self.conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True, check_same_thread=False)
+
+    def search_titles(self, query: str, limit: int = 20, ranked: bool = False) -> List[str]:
+        """Titles containing query, ignoring case (see search_titles())"""
+        return search_titles(self.conn, query, limit, ranked)
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """Titles starting with prefix, in order (see prefix_titles())"""
+        return prefix_titles(self.conn, prefix, limit)
+
+    def close(self):
+        """Close the connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    """Query the titles of a database"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search article titles')
+    parser.add_argument('query', help='Substring (or prefix with --prefix) to look for')
+    parser.add_argument('--db', type=str, default='wikipedia_articles.db', help='SQLite database file')
+    parser.add_argument('--prefix', action='store_true', help='Match titles starting with the query')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of titles')
+    parser.add_argument('--ranked', action='store_true', help='Order substring matches by relevance')
+    args = parser.parse_args()
+
+    with TitleSearch(args.db) as search:
+        if args.prefix:
+            titles = search.prefix(args.query, args.limit)
+        else:
+            titles = search.search_titles(args.query, args.limit, args.ranked)
+    for title in titles:
+        print(title)
+
+
+if __name__ == "__main__":
+    main()